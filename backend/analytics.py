@@ -0,0 +1,200 @@
+"""Vectorised risk and budget analytics with Monte Carlo forecasts.
+
+Risks, budget lines and milestones of a portfolio are loaded into columnar
+NumPy arrays once, every simulation step then works on whole
+(iterations x items) matrices instead of looping over documents. Memory stays
+bounded by MAX_CELLS, run time grows with iterations x items.
+"""
+from collections import OrderedDict
+import numpy as np
+
+
+# Risk probability class (p, 1-5) -> probability of occurrence
+RISK_PROBABILITY = np.array([0.0, 0.1, 0.3, 0.5, 0.7, 0.9])
+
+# Risk impact class (a, 1-5) -> share of the project budget at stake
+RISK_COST_SHARE = np.array([0.0, 0.01, 0.03, 0.05, 0.1, 0.2])
+
+# Risk impact class (a, 1-5) -> schedule delay in days
+RISK_DELAY_DAYS = np.array([0.0, 2.0, 5.0, 10.0, 20.0, 40.0])
+
+# Spread of the triangular distributions around the forecast values
+BUDGET_UNDERRUN = 0.05
+BUDGET_OVERRUN = 0.15
+RISK_IMPACT_SPREAD = 0.5
+
+# Projects are simulated in blocks of at most MAX_CELLS (iterations x projects)
+# results, iterations in chunks of about CHUNK_CELLS (iterations x items)
+# samples, small enough to stay in the CPU cache
+MAX_CELLS = 2000000
+CHUNK_CELLS = 1 << 17
+
+
+def triangular_params(left, mode, right):
+    """Per-item constants of the triangular inverse CDF"""
+    left, mode, right = (np.asarray(x, dtype=np.float32) for x in (left, mode, right))
+    width = right - left
+    # left == right degenerates to a constant: both branches give left
+    c = np.where(width > 0, (mode - left) / np.where(width > 0, width, 1), 0).astype(np.float32)
+    return left, right, c, width * (mode - left), width * (right - mode)
+
+
+def triangular(rng, params, size):
+    """Triangular samples of shape (size, items)"""
+    left, right, c, a, b = params
+    u = rng.random((size, len(left)), dtype=np.float32)
+    lower = u < c
+    root = np.sqrt(np.where(lower, u * a, (1 - u) * b))
+    return np.where(lower, left + root, right - root)
+
+
+def build_portfolio(project_ids, risks, budget, milestones):
+    """Load risks, budget lines and milestones of the given projects into arrays"""
+    index = {project_id: i for i, project_id in enumerate(project_ids)}
+
+    # Items are sorted by project so per-project sums are contiguous slices
+    budget = sorted((b for b in budget if b["project_id"] in index), key=lambda b: index[b["project_id"]])
+    plan = np.array([b.get("plan", 0.0) for b in budget], dtype=float)
+    actual = np.array([b.get("actual", 0.0) for b in budget], dtype=float)
+    fc = np.array([b.get("fc", 0.0) for b in budget], dtype=float)
+    # A forecast of 0 means "not estimated yet", fall back to the plan value
+    mode = np.where(fc > 0, fc, plan)
+    budget_project = np.array([index[b["project_id"]] for b in budget], dtype=np.intp)
+    budget_plan = np.bincount(budget_project, weights=plan, minlength=len(index))
+
+    risks = sorted(
+        (r for r in risks if r["project_id"] in index and r.get("status", "open") == "open"),
+        key=lambda r: index[r["project_id"]],
+    )
+    risk_project = np.array([index[r["project_id"]] for r in risks], dtype=np.intp)
+    p = np.clip(np.array([r.get("p", 1) for r in risks], dtype=np.intp), 1, 5)
+    a = np.clip(np.array([r.get("a", 1) for r in risks], dtype=np.intp), 1, 5)
+    # Chances work like risks with a negative impact
+    sign = np.array([-1.0 if r.get("category") == "chance" else 1.0 for r in risks])
+
+    slip = np.zeros(len(index))
+    for m in milestones:
+        if m["project_id"] in index and m.get("delta") is not None:
+            i = index[m["project_id"]]
+            slip[i] = max(slip[i], m["delta"])
+
+    return {
+        "project_ids": list(project_ids),
+        "budget_project": budget_project,
+        "budget_low": np.maximum(np.minimum(plan, mode) * (1 - BUDGET_UNDERRUN), actual),
+        "budget_mode": np.maximum(mode, actual),
+        "budget_high": np.maximum(np.maximum(plan, mode) * (1 + BUDGET_OVERRUN), actual),
+        "budget_plan": budget_plan,
+        "risk_project": risk_project,
+        "risk_probability": RISK_PROBABILITY[p],
+        "risk_cost": sign * RISK_COST_SHARE[a] * budget_plan[risk_project],
+        "risk_delay": sign * RISK_DELAY_DAYS[a],
+        "milestone_slip": slip,
+    }
+
+
+def group_sum(samples, groups, n_groups):
+    """Sum (iterations x items) samples per sorted group -> (iterations x groups)"""
+    out = np.zeros((samples.shape[0], n_groups), dtype=samples.dtype)
+    if len(groups):
+        starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+        out[:, groups[starts]] = np.add.reduceat(samples, starts, axis=1)
+    return out
+
+
+def simulate(portfolio, iterations=100000, seed=None):
+    """Monte Carlo forecast of cost at completion and schedule slip per project"""
+    rng = np.random.default_rng(seed)
+    n_projects = len(portfolio["project_ids"])
+    budget_project = portfolio["budget_project"]
+    risk_project = portfolio["risk_project"]
+    total = np.zeros(iterations)
+    stats = {name: np.zeros(n_projects) for name in ["cost_mean", "cost_p50", "cost_p80", "slip_p50", "slip_p80"]}
+
+    block_size = max(1, MAX_CELLS // max(iterations, 1))
+    for first in range(0, n_projects, block_size):
+        last = min(first + block_size, n_projects)
+        n = last - first
+        # Items are sorted by project, so a block of projects is a slice of items
+        b0, b1 = np.searchsorted(budget_project, [first, last])
+        r0, r1 = np.searchsorted(risk_project, [first, last])
+        budget = triangular_params(
+            portfolio["budget_low"][b0:b1], portfolio["budget_mode"][b0:b1], portfolio["budget_high"][b0:b1]
+        )
+        probability = portfolio["risk_probability"][r0:r1].astype(np.float32)
+        risk_cost = portfolio["risk_cost"][r0:r1].astype(np.float32)
+        risk_delay = portfolio["risk_delay"][r0:r1].astype(np.float32)
+        slip = portfolio["milestone_slip"][first:last].astype(np.float32)
+
+        cost = np.empty((iterations, n), dtype=np.float32)
+        delay = np.empty((iterations, n), dtype=np.float32)
+        rows = max(1, CHUNK_CELLS // max(b1 - b0, r1 - r0, n, 1))
+        for start in range(0, iterations, rows):
+            size = min(rows, iterations - start)
+            # Symmetric triangular impact factor: mean of two uniforms, cheaper than the inverse CDF
+            risk_factor = rng.random((size, r1 - r0), dtype=np.float32)
+            risk_factor += rng.random((size, r1 - r0), dtype=np.float32)
+            risk_factor -= 1
+            risk_factor *= RISK_IMPACT_SPREAD
+            risk_factor += 1
+            risk_factor *= rng.random((size, r1 - r0), dtype=np.float32) < probability
+            cost[start:start + size] = (
+                group_sum(triangular(rng, budget, size), budget_project[b0:b1] - first, n)
+                + group_sum(risk_factor * risk_cost, risk_project[r0:r1] - first, n)
+            )
+            delay[start:start + size] = slip + group_sum(risk_factor * risk_delay, risk_project[r0:r1] - first, n)
+
+        total += cost.sum(axis=1, dtype=np.float64)
+        stats["cost_mean"][first:last] = cost.mean(axis=0, dtype=np.float64)
+        stats["cost_p50"][first:last], stats["cost_p80"][first:last] = np.percentile(cost, [50, 80], axis=0)
+        stats["slip_p50"][first:last], stats["slip_p80"][first:last] = np.percentile(delay, [50, 80], axis=0)
+
+    exposure = np.bincount(
+        risk_project,
+        weights=portfolio["risk_probability"] * portfolio["risk_cost"],
+        minlength=n_projects,
+    )
+    projects = [
+        {
+            "project_id": project_id,
+            "budget_plan": float(portfolio["budget_plan"][i]),
+            "expected_exposure": float(exposure[i]),
+            "cost_mean": float(stats["cost_mean"][i]),
+            "cost_p50": float(stats["cost_p50"][i]),
+            "cost_p80": float(stats["cost_p80"][i]),
+            "slip_days_p50": float(stats["slip_p50"][i]),
+            "slip_days_p80": float(stats["slip_p80"][i]),
+        }
+        for i, project_id in enumerate(portfolio["project_ids"])
+    ]
+    return {
+        "iterations": iterations,
+        "budget_plan": float(portfolio["budget_plan"].sum()),
+        "expected_exposure": float(exposure.sum()),
+        "cost_p50": float(np.percentile(total, 50)) if n_projects else 0.0,
+        "cost_p80": float(np.percentile(total, 80)) if n_projects else 0.0,
+        "projects": projects,
+    }
+
+
+class ResultCache:
+    """Small LRU cache for simulation results keyed by the projects' data versions"""
+
+    def __init__(self, max_entries=128):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+
+    def get(self, key):
+        if key not in self.entries:
+            return None
+        self.entries.move_to_end(key)
+        return self.entries[key]
+
+    def pop(self, key):
+        return self.entries.pop(key, None)
+
+    def put(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
@@ -0,0 +1,164 @@
+"""One-page PDF status report of a project.
+
+Runs in worker processes, so the input is the plain project state (dicts with
+ISO date strings as stored in MongoDB) and the output the PDF bytes.
+"""
+from datetime import datetime
+from io import BytesIO
+from xml.sax.saxutils import escape
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.units import mm
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+
+# Bump when the layout changes so that cached reports are rendered again
+LAYOUT_VERSION = 1
+
+TOP_RISKS = 5
+MAX_TASKS = 12
+
+LAMP_COLORS = {
+    "green": colors.HexColor("#22c55e"),
+    "yellow": colors.HexColor("#eab308"),
+    "red": colors.HexColor("#ef4444"),
+}
+LAMP_LABELS = [("scope", "Umfang"), ("time", "Termine"), ("cost", "Kosten"), ("risk", "Risiken"), ("quality", "Qualität")]
+
+TABLE_STYLE = TableStyle([
+    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+    ("FONTSIZE", (0, 0), (-1, -1), 7.5),
+    ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#e5e7eb")),
+    ("GRID", (0, 0), (-1, -1), 0.25, colors.HexColor("#9ca3af")),
+    ("VALIGN", (0, 0), (-1, -1), "TOP"),
+    ("TOPPADDING", (0, 0), (-1, -1), 1.5),
+    ("BOTTOMPADDING", (0, 0), (-1, -1), 1.5),
+])
+
+
+def para(value, style):
+    # Paragraphs parse markup, user text has to be escaped
+    return Paragraph(escape(str(value or "")), style)
+
+
+def format_date(value):
+    if not value:
+        return ""
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).strftime("%d.%m.%Y")
+    except ValueError:
+        return str(value)
+
+
+def format_euro(value):
+    # 1234.5 -> "1.234,50 €"
+    text = f"{value or 0:,.2f}".replace(",", "_").replace(".", ",").replace("_", ".")
+    return f"{text} €"
+
+
+def table(rows, widths, align_right=()):
+    t = Table(rows, colWidths=[w * mm for w in widths], repeatRows=1, hAlign="LEFT")
+    t.setStyle(TABLE_STYLE)
+    for col in align_right:
+        t.setStyle(TableStyle([("ALIGN", (col, 0), (col, -1), "RIGHT")]))
+    return t
+
+
+def lamps_table(lamps):
+    t = Table([[label for _, label in LAMP_LABELS], ["" for _ in LAMP_LABELS]], colWidths=[25 * mm] * len(LAMP_LABELS), hAlign="LEFT")
+    style = [
+        ("FONTSIZE", (0, 0), (-1, -1), 8),
+        ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+        ("GRID", (0, 0), (-1, -1), 0.25, colors.HexColor("#9ca3af")),
+    ]
+    for i, (key, _) in enumerate(LAMP_LABELS):
+        color = LAMP_COLORS.get((lamps or {}).get(key), colors.HexColor("#d1d5db"))
+        style.append(("BACKGROUND", (i, 1), (i, 1), color))
+    t.setStyle(TableStyle(style))
+    return t
+
+
+def render_status_report(state: dict) -> bytes:
+    """state: {"project": {...}, "milestones": [...], "budget": [...], "risks": [...], "tasks": [...]}"""
+    project = state["project"]
+    styles = getSampleStyleSheet()
+    small = styles["BodyText"].clone("small", fontSize=7.5, leading=9)
+    heading = styles["Heading4"].clone("section", spaceBefore=4, spaceAfter=2)
+
+    story = [
+        para(f"Projektstatus: {project.get('title', '')}", styles["Heading2"]),
+        para(
+            f"Kunde: {project.get('customer', '')} · Ort: {project.get('location', '')} · "
+            f"Version {project.get('version', '')} · Stand {format_date(state.get('as_of'))} · "
+            f"Autor: {project.get('author', '')}",
+            small,
+        ),
+        Spacer(1, 3 * mm),
+        lamps_table(project.get("lamps")),
+    ]
+
+    milestones = sorted(state.get("milestones", []), key=lambda m: m.get("plan") or "")
+    story.append(Paragraph("Meilensteine", heading))
+    rows = [["Gate", "Plan", "Prognose", "Delta (Tage)", "Status", "Verantwortlich"]]
+    rows += [
+        [m.get("gate", ""), format_date(m.get("plan")), format_date(m.get("fc")),
+         "" if m.get("delta") is None else str(m["delta"]), m.get("status", ""), m.get("owner", "")]
+        for m in milestones
+    ]
+    story.append(table(rows, [40, 25, 25, 22, 25, 45], align_right=(3,)))
+
+    risks = sorted(
+        (r for r in state.get("risks", []) if r.get("status", "open") == "open"),
+        key=lambda r: -(r.get("score") or 0),
+    )
+    story.append(Paragraph(f"Top-{TOP_RISKS}-Risiken", heading))
+    rows = [["Titel", "Kategorie", "P", "A", "Score", "Maßnahme", "Verantwortlich"]]
+    rows += [
+        [para(r.get("title"), small), r.get("category", ""), r.get("p", ""), r.get("a", ""),
+         r.get("score", ""), para(r.get("resp"), small), r.get("owner", "")]
+        for r in risks[:TOP_RISKS]
+    ]
+    story.append(table(rows, [60, 20, 8, 8, 12, 100, 40], align_right=(2, 3, 4)))
+
+    budget = sorted(state.get("budget", []), key=lambda b: b.get("item", ""))
+    story.append(Paragraph("Budget", heading))
+    rows = [["Position", "Plan", "Ist", "Prognose", "Delta"]]
+    rows += [
+        [b.get("item", ""), format_euro(b.get("plan")), format_euro(b.get("actual")),
+         format_euro(b.get("fc")), format_euro(b.get("delta"))]
+        for b in budget
+    ]
+    totals = [sum(b.get(k) or 0 for b in budget) for k in ("plan", "actual", "fc", "delta")]
+    rows.append(["Summe"] + [format_euro(v) for v in totals])
+    budget_table = table(rows, [70, 32, 32, 32, 32], align_right=(1, 2, 3, 4))
+    budget_table.setStyle(TableStyle([("FONTNAME", (0, -1), (-1, -1), "Helvetica-Bold")]))
+    story.append(budget_table)
+
+    tasks = sorted(
+        (t for t in state.get("tasks", []) if (t.get("prog") or 0) < 100),
+        key=lambda t: (t.get("due") or "", t.get("pos") or 0),
+    )
+    story.append(Paragraph("Offene Aufgaben", heading))
+    rows = [["Index", "Aufgabe", "Verantwortlich", "Fällig", "Prognose", "Fortschritt", "Risiko"]]
+    rows += [
+        [t.get("index", ""), para(t.get("task"), small), t.get("owner", ""), format_date(t.get("due")),
+         format_date(t.get("fc_due")), f"{t.get('prog') or 0} %", t.get("risk_level", "")]
+        for t in tasks[:MAX_TASKS]
+    ]
+    story.append(table(rows, [18, 110, 40, 22, 22, 20, 16], align_right=(5,)))
+    if len(tasks) > MAX_TASKS:
+        story.append(Paragraph(f"… und {len(tasks) - MAX_TASKS} weitere offene Aufgaben", small))
+
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=landscape(A4),
+        leftMargin=10 * mm, rightMargin=10 * mm, topMargin=8 * mm, bottomMargin=8 * mm,
+        title=f"Projektstatus {project.get('title', '')}",
+        author=project.get("author", ""),
+        invariant=1,  # Same input, same bytes
+    )
+    doc.build(story)
+    return buffer.getvalue()
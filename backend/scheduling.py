@@ -0,0 +1,134 @@
+"""Task dependency graph with forward/backward pass scheduling.
+
+Tasks form a DAG through their predecessor lists. The forward pass computes
+the earliest start/finish of every task, the backward pass the latest
+start/finish and the slack. After a single task changes only that task and
+its successors are recomputed, visited in the cached topological order,
+so a graph kept across writes only pays for the tasks a change reaches.
+"""
+from collections import deque
+from datetime import timedelta
+
+
+class CycleError(ValueError):
+    pass
+
+
+class ScheduleGraph:
+    def __init__(self, tasks):
+        """tasks: dicts with id, date (planned start), due (planned finish),
+        predecessors and optionally fc_start/fc_due from an earlier pass"""
+        self.start = {}
+        self.duration = {}
+        self.preds = {}
+        self.succs = {}
+        self.es = {}
+        self.ef = {}
+        self._order = None
+        for task in tasks:
+            self.add(task)
+
+    def add(self, task):
+        """Add or replace a task, previous forecasts are kept if present"""
+        task_id = task["id"]
+        preds = [p for p in task.get("predecessors") or [] if p != task_id]
+        # Date-only changes and edges that agree with the cached topological
+        # order keep it, anything else sorts again on the next order()
+        if task_id not in self.start or preds != self.preds[task_id]:
+            for pred in self.preds.get(task_id, []):
+                self.succs[pred].discard(task_id)
+            self.preds[task_id] = preds
+            self.succs.setdefault(task_id, set())
+            for pred in preds:
+                self.succs.setdefault(pred, set()).add(task_id)
+            if self._order is not None and not self._keeps_order(task_id, preds):
+                self._order = None
+        self.start[task_id] = task["date"]
+        self.duration[task_id] = max(task["due"] - task["date"], timedelta(0))
+        if task.get("fc_start") and task.get("fc_due"):
+            self.es[task_id] = task["fc_start"]
+            self.ef[task_id] = task["fc_due"]
+
+    def _keeps_order(self, task_id, preds):
+        position = self._position
+        if task_id not in position:
+            # A new task goes last unless a known task already depends on it
+            if any(succ in self.start for succ in self.succs[task_id]):
+                return False
+            position[task_id] = len(self._order)
+            self._order.append(task_id)
+            return True
+        return all(position[pred] < position[task_id] for pred in preds if pred in position)
+
+    def order(self):
+        """Topological order (Kahn), raises CycleError for cyclic dependencies"""
+        if self._order is None:
+            indegree = {task_id: 0 for task_id in self.start}
+            for task_id, preds in self.preds.items():
+                indegree[task_id] = sum(1 for p in preds if p in self.start)
+            queue = deque(task_id for task_id, n in indegree.items() if n == 0)
+            order = []
+            while queue:
+                task_id = queue.popleft()
+                order.append(task_id)
+                for succ in self.succs.get(task_id, ()):
+                    indegree[succ] -= 1
+                    if indegree[succ] == 0:
+                        queue.append(succ)
+            if len(order) != len(indegree):
+                cyclic = sorted(task_id for task_id, n in indegree.items() if n > 0)
+                raise CycleError(f"Cyclic task dependencies: {', '.join(cyclic[:10])}")
+            self._order = order
+            self._position = {task_id: i for i, task_id in enumerate(order)}
+        return self._order
+
+    def affected(self, task_ids):
+        """The given tasks and everything that (transitively) depends on them"""
+        seen = set()
+        stack = [task_id for task_id in task_ids if task_id in self.start]
+        while stack:
+            task_id = stack.pop()
+            if task_id in seen:
+                continue
+            seen.add(task_id)
+            stack.extend(self.succs.get(task_id, ()))
+        return seen
+
+    def _schedule(self, task_id):
+        es = self.start[task_id]
+        for pred in self.preds[task_id]:
+            if pred in self.start:
+                pred_ef = self.ef.get(pred) or (self.start[pred] + self.duration[pred])
+                es = max(es, pred_ef)
+        self.es[task_id] = es
+        self.ef[task_id] = es + self.duration[task_id]
+
+    def forward(self, changed=None):
+        """Forward pass over all tasks, or only over the subgraph reachable
+        from the changed tasks. Returns the ids whose forecast moved."""
+        self.order()
+        if changed is None:
+            todo = self._order
+        else:
+            todo = sorted(self.affected(changed), key=self._position.__getitem__)
+        moved = set()
+        for task_id in todo:
+            before = (self.es.get(task_id), self.ef.get(task_id))
+            self._schedule(task_id)
+            if (self.es[task_id], self.ef[task_id]) != before:
+                moved.add(task_id)
+        return moved
+
+    def backward(self):
+        """Latest start/finish and slack for every task, needs a complete forward pass"""
+        order = self.order()
+        if not order:
+            return {}, {}, {}
+        project_end = max(self.ef[task_id] for task_id in order)
+        ls, lf = {}, {}
+        for task_id in reversed(order):
+            succs = [s for s in self.succs.get(task_id, ()) if s in ls]
+            lf[task_id] = min((ls[s] for s in succs), default=project_end)
+            ls[task_id] = lf[task_id] - self.duration[task_id]
+        slack = {task_id: ls[task_id] - self.es[task_id] for task_id in order}
+        return ls, lf, slack
@@ -1,15 +1,46 @@
-from fastapi import FastAPI, APIRouter, HTTPException
+from fastapi import FastAPI, APIRouter, HTTPException, Header, Query, Request, Depends
+import asyncio
+import base64
+import gzip
+import hashlib
+import hmac
+import ipaddress
+import json
+import multiprocessing
+import time
 from dotenv import load_dotenv
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
 from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import Response
 from motor.motor_asyncio import AsyncIOMotorClient
 import os
+import re
 import logging
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
 from pathlib import Path
-from pydantic import BaseModel, Field
-from typing import List, Optional
+from pydantic import BaseModel, Field, ValidationError
+from typing import Dict, List, Optional
 import uuid
-from datetime import datetime, timezone
+from datetime import datetime, timezone, timedelta
 from enum import Enum
+from analytics import ResultCache, build_portfolio, simulate
+from scheduling import CycleError, ScheduleGraph
+from pymongo import ASCENDING, DESCENDING, ReturnDocument, ReplaceOne, UpdateOne
+from pymongo.errors import DuplicateKeyError, PyMongoError
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+try:
+    from report_pdf import LAYOUT_VERSION, render_status_report
+except ImportError:  # reportlab missing, the PDF report is disabled
+    render_status_report = None
 
 
 ROOT_DIR = Path(__file__).parent
@@ -18,13 +49,340 @@ load_dotenv(ROOT_DIR / '.env')
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
 client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+
+# Every tenant (business unit) gets its own database, selected per request by
+# the X-Tenant-ID header. Requests without the header use DB_NAME itself, other
+# tenants use "<DB_NAME>__<tenant>". Accepted are the tenants listed in TENANTS
+# and those registered through POST /api/tenants with the TENANT_ADMIN_TOKEN.
+# TENANT_AUTO_REGISTER=true registers every unknown id on its first request.
+DEFAULT_TENANT = "default"
+TENANT_HEADER = "X-Tenant-ID"
+TENANT_ID_PATTERN = re.compile(r"^[a-z0-9][a-z0-9_-]{0,31}$")
+TENANTS = [t.strip().lower() for t in os.environ.get('TENANTS', '').split(',') if t.strip()]
+TENANT_ADMIN_TOKEN = os.environ.get('TENANT_ADMIN_TOKEN', '')
+TENANT_AUTO_REGISTER = os.environ.get('TENANT_AUTO_REGISTER', 'false').lower() == 'true'
+TENANT_RELOAD_SECONDS = 30
+
+# Concurrent requests per tenant; further requests wait up to
+# TENANT_QUEUE_TIMEOUT seconds for a slot and are then rejected with 503
+TENANT_MAX_CONCURRENT = int(os.environ.get('TENANT_MAX_CONCURRENT', '20'))
+TENANT_QUEUE_TIMEOUT = float(os.environ.get('TENANT_QUEUE_TIMEOUT', '5'))
+
+current_tenant: ContextVar[str] = ContextVar("current_tenant", default=DEFAULT_TENANT)
+tenant_databases = {}
+
+def tenant_database(tenant: str):
+    database = tenant_databases.get(tenant)
+    if database is None:
+        name = os.environ['DB_NAME'] if tenant == DEFAULT_TENANT else f"{os.environ['DB_NAME']}__{tenant}"
+        database = tenant_databases[tenant] = client[name]
+    return database
+
+class TenantDatabase:
+    """Stands in for the database of the tenant of the current request"""
+
+    def __getattr__(self, name):
+        return getattr(tenant_database(current_tenant.get()), name)
+
+    def __getitem__(self, name):
+        return tenant_database(current_tenant.get())[name]
+
+db = TenantDatabase()
+
+# Every n-th history entry of a project also stores a full checkpoint so that
+# point-in-time reads never have to replay more than n diffs
+HISTORY_CHECKPOINT_INTERVAL = int(os.environ.get('HISTORY_CHECKPOINT_INTERVAL', '25'))
+
+# Collections whose writes are recorded in the project history
+HISTORY_COLLECTIONS = ["projects", "milestones", "budget", "risks", "tasks", "changes"]
+
+# Closed projects are moved with all child documents into "archive_*" collections
+ARCHIVE_PREFIX = "archive_"
+ARCHIVE_INTERVAL_HOURS = float(os.environ.get('ARCHIVE_INTERVAL_HOURS', '24'))
+
+# Per-project KPI snapshots for trend charts
+KPI_COLLECTION = "project_kpis"
+KPI_SNAPSHOT_INTERVAL_HOURS = float(os.environ.get('KPI_SNAPSHOT_INTERVAL_HOURS', '24'))
+
+# Monte Carlo forecasts are cached per set of project data versions. Run time
+# grows with projects x iterations, so the portfolio is paged and pages are
+# shortened to at most FORECAST_MAX_PROJECT_ITERATIONS simulated project runs
+# (10 projects at 100k iterations take about half a second).
+FORECAST_MAX_ITERATIONS = 1000000
+FORECAST_PAGE_SIZE = 10
+FORECAST_MAX_PROJECTS = 100
+FORECAST_MAX_PROJECT_ITERATIONS = 2000000
+forecast_cache = ResultCache()
+
+# Task graphs of recently scheduled projects, each valid at one history seq.
+# A task write then only reschedules the tasks it reaches.
+SCHEDULE_CACHE_PROJECTS = int(os.environ.get('SCHEDULE_CACHE_PROJECTS', '32'))
+schedule_graphs = ResultCache(max_entries=SCHEDULE_CACHE_PROJECTS)
+
+# Rendered PDF status reports, cached on disk per content hash of the project
+# data. Writes are collected for REPORT_RENDER_DELAY seconds before a cached
+# report is rendered again in the background.
+REPORT_CACHE_DIR = Path(os.environ.get('REPORT_CACHE_DIR', ROOT_DIR / 'report_cache'))
+REPORT_WORKERS = int(os.environ.get('REPORT_WORKERS', '2'))
+REPORT_RENDER_DELAY = float(os.environ.get('REPORT_RENDER_DELAY', '5'))
+
+# Consistency checker: documents per batch, violations kept per run and the
+# interval of the incremental background run (CONSISTENCY_INTERVAL_HOURS=0
+# disables it, CONSISTENCY_AUTO_REPAIR=true lets it repair what it can)
+CONSISTENCY_BATCH_SIZE = int(os.environ.get('CONSISTENCY_BATCH_SIZE', '1000'))
+CONSISTENCY_MAX_VIOLATIONS = 1000
+CONSISTENCY_INTERVAL_HOURS = float(os.environ.get('CONSISTENCY_INTERVAL_HOURS', '24'))
+CONSISTENCY_AUTO_REPAIR = os.environ.get('CONSISTENCY_AUTO_REPAIR', 'false').lower() == 'true'
+
+# Token bucket per tenant, client and route, RATE_LIMIT_PER_MINUTE=0 disables limiting
+RATE_LIMIT_PER_MINUTE = float(os.environ.get('RATE_LIMIT_PER_MINUTE', '300'))
+RATE_LIMIT_BURST = float(os.environ.get('RATE_LIMIT_BURST', '60'))
+RATE_LIMIT_MAX_BUCKETS = 10000
+
+# X-Forwarded-For is only honoured on requests from these addresses or
+# networks (comma separated), e.g. the reverse proxy in front of the backend
+TRUSTED_PROXIES = [
+    ipaddress.ip_network(p.strip(), strict=False)
+    for p in os.environ.get('TRUSTED_PROXIES', '').split(',') if p.strip()
+]
+
+# Responses at least this large are compressed if the client accepts it
+COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', '1024'))
+
+# Columnar list layout: {"columns": [...], "rows": [[...], ...]}
+COLUMNAR_MEDIA_TYPE = "application/vnd.columnar+json"
+
+# Delta sync re-reads this many seconds before the client's watermark so that
+# writes committed while the previous sync was running are not missed
+SYNC_OVERLAP_SECONDS = 5
+# Documents per sync page, later pages are fetched with the returned cursor
+SYNC_PAGE_SIZE = 2000
+SYNC_MAX_PAGE_SIZE = 10000
+
+# Workload: weight of one open item and default weekly capacity per person
+WORKLOAD_WEIGHTS = {"tasks": 1.0, "risks": 0.5, "changes": 1.0}
+WORKLOAD_DEFAULT_CAPACITY = float(os.environ.get('WORKLOAD_DEFAULT_CAPACITY', '10'))
 
 # Create the main app without a prefix
 app = FastAPI()
 
+# Rate limiting and request coalescing
+class TokenBucketLimiter:
+    """Token buckets keyed by (tenant, client, route), refilled continuously"""
+
+    def __init__(self, per_minute: float, burst: float, max_buckets: int = RATE_LIMIT_MAX_BUCKETS):
+        self.rate = per_minute / 60.0
+        self.burst = burst
+        self.max_buckets = max_buckets
+        self.buckets = OrderedDict()
+
+    def take(self, key):
+        """Take one token, returns the seconds to wait if the bucket is empty"""
+        now = time.monotonic()
+        tokens, last = self.buckets.get(key, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - last) * self.rate)
+        if tokens < 1:
+            self.put(key, (tokens, now))
+            return (1 - tokens) / self.rate
+        self.put(key, (tokens - 1, now))
+        return 0.0
+
+    def put(self, key, bucket):
+        # Least recently used first, the oldest bucket is the likeliest to be full again
+        self.buckets[key] = bucket
+        self.buckets.move_to_end(key)
+        if len(self.buckets) > self.max_buckets:
+            self.buckets.popitem(last=False)
+
+class SingleFlight:
+    """Concurrent calls with the same key share one in-flight coroutine"""
+
+    def __init__(self):
+        self.inflight = {}
+
+    async def do(self, key, func):
+        task = self.inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self.inflight[key] = task
+            task.add_done_callback(lambda _: self.inflight.pop(key, None))
+        # shield so one cancelled caller does not cancel the query for everyone else
+        return await asyncio.shield(task)
+
+class TenantGate:
+    """Concurrency slots and request metrics per tenant"""
+
+    def __init__(self, max_concurrent: int, queue_timeout: float):
+        self.max_concurrent = max_concurrent
+        self.queue_timeout = queue_timeout
+        self.slots = {}
+        self.metrics = {}
+
+    def stats(self, tenant):
+        return self.metrics.setdefault(tenant, {
+            "requests": 0, "rejected": 0, "errors": 0, "in_flight": 0, "queued": 0,
+            "total_ms": 0.0, "max_ms": 0.0,
+        })
+
+    async def acquire(self, tenant) -> bool:
+        """Wait for a free slot, False if none became free within the timeout"""
+        slot = self.slots.get(tenant)
+        if slot is None:
+            slot = self.slots[tenant] = asyncio.Semaphore(self.max_concurrent)
+        stats = self.stats(tenant)
+        stats["queued"] += 1
+        try:
+            await asyncio.wait_for(slot.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            stats["rejected"] += 1
+            return False
+        finally:
+            stats["queued"] -= 1
+        stats["in_flight"] += 1
+        return True
+
+    def release(self, tenant, elapsed_ms: float, failed: bool):
+        self.slots[tenant].release()
+        stats = self.stats(tenant)
+        stats["in_flight"] -= 1
+        stats["requests"] += 1
+        stats["errors"] += int(failed)
+        stats["total_ms"] += elapsed_ms
+        stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+
+class TenantRegistry:
+    """Registered tenant ids, reloaded for unknown ids at most every
+    reload_seconds so that registrations through other workers show up"""
+
+    def __init__(self, reload_seconds: float):
+        self.reload_seconds = reload_seconds
+        self.ids = set()
+        self.loaded_at = None
+
+    async def contains(self, tenant):
+        if tenant in self.ids:
+            return True
+        now = time.monotonic()
+        if self.loaded_at is None or now - self.loaded_at >= self.reload_seconds:
+            self.loaded_at = now
+            self.ids = set(await tenant_database(DEFAULT_TENANT).tenants.distinct("id"))
+        return tenant in self.ids
+
+    async def register(self, tenant):
+        await tenant_database(DEFAULT_TENANT).tenants.update_one(
+            {"id": tenant},
+            {"$setOnInsert": {"id": tenant, "created_at": datetime.now(timezone.utc).isoformat()}},
+            upsert=True,
+        )
+        self.ids.add(tenant)
+
+rate_limiter = TokenBucketLimiter(RATE_LIMIT_PER_MINUTE, RATE_LIMIT_BURST) if RATE_LIMIT_PER_MINUTE > 0 else None
+read_flights = SingleFlight()
+tenant_gate = TenantGate(TENANT_MAX_CONCURRENT, TENANT_QUEUE_TIMEOUT)
+tenant_setups = SingleFlight()
+tenant_registry = TenantRegistry(TENANT_RELOAD_SECONDS)
+report_renders = SingleFlight()
+ready_tenants = set()
+
+def trusted_proxy(address: str):
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in TRUSTED_PROXIES)
+
+def client_key(request: Request):
+    """Client address, taken from X-Forwarded-For only behind a trusted proxy.
+
+    Every proxy appends the address it got the request from, so the client is
+    the rightmost entry that was not added by a trusted proxy. Entries further
+    left are whatever the client sent.
+    """
+    peer = request.client.host if request.client else "unknown"
+    forwarded = request.headers.get("x-forwarded-for")
+    if not forwarded or not trusted_proxy(peer):
+        return peer
+    hops = [hop.strip() for hop in forwarded.split(",") if hop.strip()]
+    for hop in reversed(hops):
+        if not trusted_proxy(hop):
+            return hop
+    return hops[0] if hops else peer
+
+async def rate_limit(request: Request):
+    if rate_limiter is None:
+        return
+    route = request.scope.get("route")
+    route_key = f"{request.method} {route.path if route else request.url.path}"
+    retry_after = rate_limiter.take((current_tenant.get(), client_key(request), route_key))
+    if retry_after > 0:
+        raise HTTPException(
+            status_code=429,
+            detail=f"Rate limit exceeded for {route_key}, retry in {retry_after:.1f}s",
+            headers={"Retry-After": str(max(1, round(retry_after)))},
+        )
+
+def wants_columnar(request: Request):
+    return COLUMNAR_MEDIA_TYPE in request.headers.get("accept", "")
+
+def to_columnar(items):
+    """Columnar layout for a list of flat documents, keys are sent only once"""
+    columns = []
+    for item in items:
+        for key in item:
+            if key not in columns:
+                columns.append(key)
+    return {"columns": columns, "rows": [[item.get(key) for key in columns] for item in items]}
+
+def list_response(request: Request, items, total: Optional[int] = None):
+    """Return models as-is or in the columnar layout if the client asked for it.
+
+    With a total the response carries an X-Total-Count header for paging clients.
+    """
+    headers = {"X-Total-Count": str(total)} if total is not None else None
+    if wants_columnar(request):
+        return JSONResponse(to_columnar(jsonable_encoder(items)), media_type=COLUMNAR_MEDIA_TYPE, headers=headers)
+    if headers:
+        return JSONResponse(jsonable_encoder(items), headers=headers)
+    return items
+
+class ListParams:
+    """Server-side sorting and paging for list endpoints, sort is "field" or "-field" """
+
+    def __init__(
+        self,
+        sort: Optional[str] = None,
+        skip: int = Query(0, ge=0),
+        limit: int = Query(1000, ge=1, le=1000),
+        with_total: bool = False,
+    ):
+        self.sort = sort
+        self.skip = skip
+        self.limit = limit
+        self.with_total = with_total
+
+    def sort_spec(self, model):
+        if not self.sort:
+            return None
+        field = self.sort.lstrip("-")
+        if field not in model.model_fields:
+            raise HTTPException(status_code=400, detail=f"Cannot sort by unknown field '{field}'")
+        # id as tie-breaker keeps pages stable for equal sort values
+        return [(field, DESCENDING if self.sort.startswith("-") else ASCENDING), ("id", ASCENDING)]
+
+def with_filters(query: dict, **filters):
+    """Add equality filters for all given values that are not None"""
+    return {**query, **{key: value for key, value in filters.items() if value is not None}}
+
+def pick_encoding(accept_encoding: str):
+    accepted = {part.split(";")[0].strip().lower() for part in accept_encoding.split(",")}
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
 # Create a router with the /api prefix
-api_router = APIRouter(prefix="/api")
+api_router = APIRouter(prefix="/api", dependencies=[Depends(rate_limit)])
 
 # Enums
 class ProjectStatus(str, Enum):
@@ -66,6 +424,9 @@ class Project(BaseModel):
     date: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     author: str
     status: ProjectStatus = ProjectStatus.PLANNING
+    # Status at the last restore from the archive, the archive job leaves the
+    # project alone until the status changes
+    restored_status: Optional[ProjectStatus] = None
     lamps: Optional[dict] = Field(default_factory=lambda: {
         "scope": "green",
         "time": "green", 
@@ -73,6 +434,7 @@ class Project(BaseModel):
         "risk": "green",
         "quality": "green"
     })
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 class ProjectCreate(BaseModel):
     title: str
@@ -91,6 +453,8 @@ class Milestone(BaseModel):
     delta: Optional[int] = None
     status: MilestoneStatus = MilestoneStatus.PLANNED
     owner: str
+    task_ids: List[str] = []  # Tasks whose forecast finish drives fc
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 class MilestoneCreate(BaseModel):
     project_id: str
@@ -99,6 +463,7 @@ class MilestoneCreate(BaseModel):
     fc: Optional[datetime] = None
     owner: str
     status: MilestoneStatus = MilestoneStatus.PLANNED
+    task_ids: List[str] = []
 
 class Budget(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -109,6 +474,7 @@ class Budget(BaseModel):
     fc: float = 0.0
     delta: float = 0.0
     comment: Optional[str] = None
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 class BudgetCreate(BaseModel):
     project_id: str
@@ -132,6 +498,7 @@ class Risk(BaseModel):
     resp: str  # Response
     owner: str
     status: str = "open"
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 class RiskCreate(BaseModel):
     project_id: str
@@ -160,6 +527,10 @@ class Task(BaseModel):
     risk_level: RiskLevel = RiskLevel.LOW
     risk_desc: Optional[str] = None
     note: Optional[str] = None
+    predecessors: List[str] = []  # Task ids that have to finish first
+    fc_start: Optional[datetime] = None  # Forecast from the schedule forward pass
+    fc_due: Optional[datetime] = None
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 class TaskCreate(BaseModel):
     project_id: str
@@ -174,6 +545,7 @@ class TaskCreate(BaseModel):
     risk_level: RiskLevel = RiskLevel.LOW
     risk_desc: Optional[str] = None
     note: Optional[str] = None
+    predecessors: List[str] = []
 
 class ChangeRequest(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -195,6 +567,7 @@ class ChangeRequest(BaseModel):
     decision_maker: str
     planned_implementation: Optional[str] = None
     notes: Optional[str] = None
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 class ChangeRequestCreate(BaseModel):
     project_id: str
@@ -216,6 +589,173 @@ class ChangeRequestCreate(BaseModel):
     notes: Optional[str] = None
     status: ChangeStatus = ChangeStatus.OPEN
 
+class ChildCollection(str, Enum):
+    MILESTONES = "milestones"
+    BUDGET = "budget"
+    RISKS = "risks"
+    TASKS = "tasks"
+    CHANGES = "changes"
+
+class BatchRequest(BaseModel):
+    project_ids: List[str] = Field(min_length=1)
+    include_archived: bool = False
+
+class SyncResponse(BaseModel):
+    watermark: datetime
+    full: bool
+    projects: List[Project] = []
+    milestones: List[Milestone] = []
+    budget: List[Budget] = []
+    risks: List[Risk] = []
+    tasks: List[Task] = []
+    changes: List[ChangeRequest] = []
+    deleted: Dict[str, List[str]] = {}
+    removed_projects: List[str] = []
+    has_more: bool = False
+    cursor: Optional[str] = None  # Pass back to get the next page
+
+class SyncCursor(BaseModel):
+    """Position of a paged sync: the sync's own watermark and time window, the
+    collection being read and the last (updated_at, id) sent from it"""
+    watermark: datetime
+    since: Optional[datetime] = None
+    collection: str
+    updated_at: Optional[str] = None
+    id: str = ""
+
+class ScheduleEntry(BaseModel):
+    task_id: str
+    es: datetime
+    ef: datetime
+    ls: datetime
+    lf: datetime
+    slack_days: float
+    critical: bool
+
+class ProjectSchedule(BaseModel):
+    project_id: str
+    finish: Optional[datetime] = None
+    critical_path: List[str] = []
+    tasks: List[ScheduleEntry] = []
+
+class Person(BaseModel):
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    key: str  # Normalised name, referenced as owner_key etc. by tasks, risks, ...
+    name: str
+    email: Optional[str] = None
+    aliases: List[str] = []
+    capacity_per_week: Optional[float] = None
+
+class PersonCreate(BaseModel):
+    name: str
+    email: Optional[str] = None
+    aliases: List[str] = []
+    capacity_per_week: Optional[float] = None
+
+class WeekLoad(BaseModel):
+    week_start: datetime
+    tasks: int = 0
+    risks: int = 0
+    changes: int = 0
+    load: float = 0.0
+    overloaded: bool = False
+
+class OwnerWorkload(BaseModel):
+    person_key: str
+    name: str
+    capacity_per_week: float
+    overloaded: bool = False
+    weeks: List[WeekLoad] = []
+
+class ArchiveResult(BaseModel):
+    project_ids: List[str] = []
+    documents: int = 0
+
+class ConsistencyViolation(BaseModel):
+    collection: str
+    doc_id: Optional[str] = None
+    project_id: Optional[str] = None
+    kind: str  # "invalid", "bad_date", "orphan", "archived_parent", "drift"
+    detail: str
+    repaired: bool = False
+
+class ConsistencyReport(BaseModel):
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    incremental: bool
+    repair: bool
+    started_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    finished_at: Optional[datetime] = None
+    scanned: Dict[str, int] = {}
+    counts: Dict[str, int] = {}
+    violations: List[ConsistencyViolation] = []  # The first CONSISTENCY_MAX_VIOLATIONS
+    truncated: bool = False
+
+class TenantRegistration(BaseModel):
+    id: str
+
+class TenantMetrics(BaseModel):
+    tenant: str
+    max_concurrent: int
+    requests: int = 0
+    rejected: int = 0
+    errors: int = 0
+    in_flight: int = 0
+    queued: int = 0
+    avg_ms: float = 0.0
+    max_ms: float = 0.0
+
+class TrendResolution(str, Enum):
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+
+class KpiSnapshot(BaseModel):
+    project_id: str
+    ts: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    budget_plan: float = 0.0
+    budget_actual: float = 0.0
+    budget_fc: float = 0.0
+    risk_score_open: int = 0
+    task_progress_avg: Optional[float] = None
+    lamps: Optional[dict] = None
+
+class ProjectForecast(BaseModel):
+    project_id: str
+    budget_plan: float
+    expected_exposure: float
+    cost_mean: float
+    cost_p50: float
+    cost_p80: float
+    slip_days_p50: float
+    slip_days_p80: float
+
+class PortfolioForecast(BaseModel):
+    iterations: int
+    budget_plan: float
+    expected_exposure: float
+    cost_p50: float
+    cost_p80: float
+    projects: List[ProjectForecast] = []
+
+class HistoryEntry(BaseModel):
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    project_id: str
+    seq: int
+    ts: datetime
+    collection: str
+    doc_id: str
+    op: str  # "create", "update", "delete"
+    diff: dict = Field(default_factory=dict)
+
+class ProjectReport(BaseModel):
+    as_of: datetime
+    project: Project
+    milestones: List[Milestone] = []
+    budget: List[Budget] = []
+    risks: List[Risk] = []
+    tasks: List[Task] = []
+    changes: List[ChangeRequest] = []
+
 # Helper functions
 def prepare_for_mongo(data):
     """Convert datetime objects to ISO strings for MongoDB storage"""
@@ -225,17 +765,885 @@ def prepare_for_mongo(data):
                 data[key] = value.isoformat()
     return data
 
+DATE_FIELDS = ['date', 'plan', 'fc', 'due', 'fc_start', 'fc_due']
+
 def parse_from_mongo(item):
     """Parse datetime strings back from MongoDB"""
     if isinstance(item, dict):
         for key, value in item.items():
-            if isinstance(value, str) and key in ['date', 'plan', 'fc', 'due']:
+            if isinstance(value, str) and key in DATE_FIELDS:
                 try:
                     item[key] = datetime.fromisoformat(value)
                 except:
                     pass
     return item
 
+# History helpers
+def compute_diff(before, after):
+    """Compact diff between two stored documents (None means missing)"""
+    if after is None:
+        return {"deleted": True}
+    before = before or {}
+    diff = {}
+    changed = {k: v for k, v in after.items() if k not in before or before[k] != v}
+    removed = [k for k in before if k not in after]
+    if changed:
+        diff["set"] = changed
+    if removed:
+        diff["unset"] = removed
+    return diff
+
+def apply_diff(doc, diff):
+    """Apply a diff from compute_diff, returns None if the document was deleted"""
+    if diff.get("deleted"):
+        return None
+    doc = dict(doc or {})
+    doc.update(diff.get("set", {}))
+    for key in diff.get("unset", []):
+        doc.pop(key, None)
+    return doc
+
+def strip_mongo_id(doc):
+    if doc is None:
+        return None
+    return {k: v for k, v in doc.items() if k != "_id"}
+
+async def load_live_state(project_id: str, prefix: str = ""):
+    """Current state of a project and all its child documents"""
+    state = {name: {} for name in HISTORY_COLLECTIONS}
+    project = await db[prefix + "projects"].find_one({"id": project_id}, {"_id": 0, "archived_at": 0})
+    if project:
+        state["projects"][project_id] = project
+    for name in HISTORY_COLLECTIONS[1:]:
+        async for doc in db[prefix + name].find({"project_id": project_id}, {"_id": 0}):
+            state[name][doc["id"]] = doc
+    return state
+
+async def build_project_state(project_id: str, as_of: Optional[str] = None):
+    """Rebuild a project state from the nearest checkpoint plus the diffs after it"""
+    checkpoint_query = {"project_id": project_id}
+    history_query = {"project_id": project_id}
+    if as_of:
+        checkpoint_query["ts"] = {"$lte": as_of}
+        history_query["ts"] = {"$lte": as_of}
+
+    checkpoint = await db.project_checkpoints.find_one(
+        checkpoint_query, sort=[("ts", DESCENDING), ("seq", DESCENDING)]
+    )
+    if checkpoint:
+        state = checkpoint["state"]
+        history_query["seq"] = {"$gt": checkpoint["seq"]}
+    else:
+        state = {name: {} for name in HISTORY_COLLECTIONS}
+
+    cursor = db.project_history.find(history_query).sort([("ts", ASCENDING), ("seq", ASCENDING)])
+    async for entry in cursor:
+        docs = state.setdefault(entry["collection"], {})
+        doc = apply_diff(docs.get(entry["doc_id"]), entry["diff"])
+        if doc is None:
+            docs.pop(entry["doc_id"], None)
+        else:
+            docs[entry["doc_id"]] = doc
+    return state
+
+async def record_history(project_id: str, collection: str, doc_id: str, before, after):
+    """Append a write to the project history, checkpointing every few entries"""
+    entries = await record_history_many(project_id, collection, [(doc_id, before, after)])
+    return entries[0] if entries else None
+
+async def record_history_many(project_id: str, collection: str, writes):
+    """Append several writes (doc_id, before, after) of one collection with one
+    counter update and one insert"""
+    changes = []
+    for doc_id, before, after in writes:
+        before = strip_mongo_id(before)
+        after = strip_mongo_id(after)
+        diff = compute_diff(before, after)
+        if diff:
+            changes.append((doc_id, before, after, diff))
+    if not changes:
+        return []
+
+    counter = await db.history_counters.find_one_and_update(
+        {"project_id": project_id},
+        {"$inc": {"seq": len(changes)}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+    last_seq = counter["seq"]
+    first_seq = last_seq - len(changes) + 1
+    ts = datetime.now(timezone.utc).isoformat()
+
+    # Data written before history was enabled gets a baseline checkpoint. The
+    # live state already contains these writes, so they are undone in the
+    # baseline. Only a newly created project has nothing to keep.
+    if first_seq == 1 and not (collection == "projects" and changes[0][1] is None):
+        baseline = await load_live_state(project_id)
+        for doc_id, before, _, _ in changes:
+            if before is None:
+                baseline[collection].pop(doc_id, None)
+            else:
+                baseline[collection][doc_id] = before
+        await db.project_checkpoints.insert_one({
+            "project_id": project_id,
+            "seq": 0,
+            "ts": ts,
+            "state": baseline,
+        })
+
+    entries = [
+        HistoryEntry(
+            project_id=project_id,
+            seq=first_seq + i,
+            ts=ts,
+            collection=collection,
+            doc_id=doc_id,
+            op="delete" if after is None else "create" if before is None else "update",
+            diff=diff,
+        )
+        for i, (doc_id, before, after, diff) in enumerate(changes)
+    ]
+    await db.project_history.insert_many([prepare_for_mongo(entry.dict()) for entry in entries])
+    schedule_report_refresh(project_id)
+
+    if last_seq // HISTORY_CHECKPOINT_INTERVAL > (first_seq - 1) // HISTORY_CHECKPOINT_INTERVAL:
+        state = await build_project_state(project_id)
+        await db.project_checkpoints.insert_one({
+            "project_id": project_id,
+            "seq": last_seq,
+            "ts": ts,
+            "state": state,
+        })
+    return entries
+
+def report_from_state(state, project_id: str, as_of: datetime):
+    project = state.get("projects", {}).get(project_id)
+    if not project:
+        return None
+    return ProjectReport(
+        as_of=as_of,
+        project=Project(**parse_from_mongo(dict(project))),
+        milestones=[Milestone(**parse_from_mongo(dict(d))) for d in state.get("milestones", {}).values()],
+        budget=[Budget(**parse_from_mongo(dict(d))) for d in state.get("budget", {}).values()],
+        risks=[Risk(**parse_from_mongo(dict(d))) for d in state.get("risks", {}).values()],
+        tasks=[Task(**parse_from_mongo(dict(d))) for d in state.get("tasks", {}).values()],
+        changes=[ChangeRequest(**parse_from_mongo(dict(d))) for d in state.get("changes", {}).values()],
+    )
+
+def iso_utc(value: datetime):
+    """ISO string in UTC, comparable with the stored ISO timestamps"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).isoformat()
+
+def with_updated_since(query: dict, updated_since: Optional[datetime]):
+    if updated_since:
+        query = {**query, "updated_at": {"$gt": iso_utc(updated_since)}}
+    return query
+
+def project_query(project_id: Optional[List[str]]):
+    """Filter for one or several project ids, several use one $in on the project_id index"""
+    if not project_id:
+        return {}
+    if len(project_id) == 1:
+        return {"project_id": project_id[0]}
+    return {"project_id": {"$in": sorted(set(project_id))}}
+
+async def count_documents(collection: str, query: dict, include_archived: bool = False):
+    total = await db[collection].count_documents(query)
+    if include_archived:
+        total += await db[ARCHIVE_PREFIX + collection].count_documents(query)
+    return total
+
+async def list_documents(request: Request, model, collection: str, query: dict, include_archived: bool, params: ListParams):
+    """Shared implementation of the sorted, paged list endpoints"""
+    docs = await find_documents(
+        collection, query, include_archived, params.limit, params.sort_spec(model), params.skip
+    )
+    total = await count_documents(collection, query, include_archived) if params.with_total else None
+    return list_response(request, [model(**parse_from_mongo(doc)) for doc in docs], total)
+
+# Scheduling helpers
+def as_utc(value: Optional[datetime]):
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+async def history_seq(project_id: str):
+    counter = await db.history_counters.find_one({"project_id": project_id}, {"_id": 0, "seq": 1})
+    return counter["seq"] if counter else 0
+
+async def load_schedule_graph(project_id: str):
+    """The task graph of a project and the history seq it matches.
+
+    A cached graph is taken out of the cache, so concurrent requests never
+    share one; keep_schedule_graph puts it back once it matches the stored
+    tasks again.
+    """
+    seq = await history_seq(project_id)
+    cached = schedule_graphs.pop((current_tenant.get(), project_id))
+    if cached and cached[0] == seq:
+        return cached[1], seq
+    fields = {"_id": 0, "id": 1, "date": 1, "due": 1, "predecessors": 1, "fc_start": 1, "fc_due": 1}
+    tasks = []
+    async for doc in db.tasks.find({"project_id": project_id}, fields):
+        doc = parse_from_mongo(doc)
+        for key in ["date", "due", "fc_start", "fc_due"]:
+            doc[key] = as_utc(doc.get(key))
+        tasks.append(doc)
+    return ScheduleGraph(tasks), seq
+
+async def keep_schedule_graph(project_id: str, graph: ScheduleGraph, seq: int):
+    """Cache the graph unless someone else wrote to the project since seq"""
+    if await history_seq(project_id) == seq:
+        schedule_graphs.put((current_tenant.get(), project_id), (seq, graph))
+
+async def check_dependencies(task_obj: Task):
+    """Load the project graph with the new or changed task, rejecting bad dependencies"""
+    graph, seq = await load_schedule_graph(task_obj.project_id)
+    graph.add({
+        "id": task_obj.id,
+        "date": as_utc(task_obj.date),
+        "due": as_utc(task_obj.due),
+        "predecessors": task_obj.predecessors,
+    })
+    missing = [p for p in task_obj.predecessors if p not in graph.start]
+    if missing:
+        raise HTTPException(status_code=400, detail=f"Unknown predecessor tasks: {', '.join(sorted(missing))}")
+    try:
+        graph.order()
+    except CycleError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return graph, seq
+
+async def reschedule(project_id: str, graph: ScheduleGraph, changed: Optional[List[str]] = None):
+    """Recompute forecasts of the changed tasks and their successors (all tasks
+    if changed is None), then update fc/delta of the milestones linked to them.
+    Returns the number of history entries written."""
+    moved = graph.forward(changed)
+    now = datetime.now(timezone.utc).isoformat()
+    recorded = 0
+    if moved:
+        # Forecasts are part of the stored task and so of its history
+        before = {doc["id"]: doc async for doc in db.tasks.find({"id": {"$in": sorted(moved)}}, {"_id": 0})}
+        updates = {
+            task_id: {
+                "fc_start": graph.es[task_id].isoformat(),
+                "fc_due": graph.ef[task_id].isoformat(),
+                "updated_at": now,
+            }
+            for task_id in sorted(moved) if task_id in before
+        }
+        if updates:
+            await db.tasks.bulk_write(
+                [UpdateOne({"id": task_id}, {"$set": update}) for task_id, update in updates.items()], ordered=False
+            )
+            entries = await record_history_many(project_id, "tasks", [
+                (task_id, before[task_id], {**before[task_id], **update}) for task_id, update in updates.items()
+            ])
+            recorded += len(entries)
+
+    query = {"project_id": project_id, "task_ids": {"$ne": []}}
+    if changed is not None:
+        if not moved:
+            return recorded
+        query["task_ids"] = {"$in": list(moved)}
+    async for milestone in db.milestones.find(query, {"_id": 0}):
+        finishes = [graph.ef[t] for t in milestone.get("task_ids", []) if t in graph.ef]
+        if not finishes:
+            continue
+        fc = max(finishes)
+        plan = as_utc(parse_from_mongo({"plan": milestone["plan"]})["plan"])
+        # plan is stored normalised too, so fc and plan never mix naive and aware
+        update = {"fc": fc.isoformat(), "plan": plan.isoformat(), "delta": (fc - plan).days}
+        if all(milestone.get(k) == v for k, v in update.items()):
+            continue
+        update["updated_at"] = now
+        await db.milestones.update_one({"id": milestone["id"]}, {"$set": update})
+        if await record_history(project_id, "milestones", milestone["id"], milestone, {**milestone, **update}):
+            recorded += 1
+    return recorded
+
+# People helpers
+def person_key(name: str):
+    """Normalise a free-text person name: case and whitespace do not matter"""
+    return " ".join(name.split()).casefold()
+
+async def resolve_person(name: Optional[str]):
+    """Registry key for a name, registering unknown people on first sight"""
+    if not name or not name.strip():
+        return None
+    key = person_key(name)
+    # An alias wins over a person registered automatically under that spelling
+    person = await db.people.find_one({"aliases": key}, {"key": 1}) or await db.people.find_one({"key": key}, {"key": 1})
+    if person:
+        return person["key"]
+    await db.people.update_one(
+        {"key": key},
+        {"$setOnInsert": Person(key=key, name=" ".join(name.split())).dict()},
+        upsert=True,
+    )
+    return key
+
+async def registry_keys(names: List[str]):
+    """Registry keys to match for the given names, aliases included, without
+    registering anyone"""
+    keys = {person_key(name) for name in names if name and name.strip()}
+    async for person in db.people.find({"aliases": {"$in": list(keys)}}, {"key": 1}):
+        keys.add(person["key"])
+    return sorted(keys)
+
+async def add_person_keys(data: dict, *fields: str):
+    """Store the registry key of each person field next to it, e.g. owner_key"""
+    for field in fields:
+        data[f"{field}_key"] = await resolve_person(data.get(field))
+    return data
+
+PERSON_FIELDS = {
+    "tasks": ["owner"],
+    "risks": ["owner"],
+    "milestones": ["owner"],
+    "changes": ["requester", "decision_maker"],
+}
+
+def week_start(day: datetime):
+    day = day.replace(hour=0, minute=0, second=0, microsecond=0)
+    return day - timedelta(days=day.weekday())
+
+# Archive helpers
+def find_cursor(collection: str, query: dict, projection: dict, sort=None, skip: int = 0, limit: Optional[int] = None):
+    cursor = db[collection].find(query, projection)
+    if sort:
+        cursor = cursor.sort(sort)
+    if skip:
+        cursor = cursor.skip(skip)
+    if limit:
+        cursor = cursor.limit(limit)
+    return cursor
+
+async def find_documents(
+    collection: str,
+    query: dict,
+    include_archived: bool = False,
+    limit: Optional[int] = 1000,
+    sort=None,
+    skip: int = 0,
+):
+    """Find documents in a live collection, optionally reading through to its archive.
+
+    Archived documents are paged after the live ones. Identical concurrent reads
+    share one query, every caller gets its own copies.
+    """
+    async def fetch():
+        docs = await find_cursor(collection, query, {"_id": 0}, sort, skip, limit).to_list(limit)
+        if include_archived and (limit is None or len(docs) < limit):
+            # Live documents are exhausted, continue with the archive
+            live_total = skip + len(docs) if docs else await db[collection].count_documents(query)
+            remaining = None if limit is None else limit - len(docs)
+            archive = find_cursor(
+                ARCHIVE_PREFIX + collection, query, {"_id": 0, "archived_at": 0}, sort, max(0, skip - live_total), remaining
+            )
+            docs += await archive.to_list(remaining)
+        return docs
+
+    key = (current_tenant.get(), collection, repr(sorted(query.items())), include_archived, limit, repr(sort), skip)
+    docs = await read_flights.do(key, fetch)
+    return [dict(doc) for doc in docs]
+
+async def move_project_data(project_id: str, source_prefix: str, target_prefix: str):
+    """Move a project and its children between live and archive collections.
+
+    Children are moved before the project itself and copies are upserts, so an
+    interrupted move can simply be run again.
+    """
+    # Moves are not recorded in the history, the seq alone does not invalidate
+    schedule_graphs.pop((current_tenant.get(), project_id))
+    moved = 0
+    for name in HISTORY_COLLECTIONS[1:] + ["projects"]:
+        key = "id" if name == "projects" else "project_id"
+        docs = await db[source_prefix + name].find({key: project_id}, {"_id": 0}).to_list(None)
+        if not docs:
+            continue
+        if name == "projects":
+            for doc in docs:
+                if target_prefix == ARCHIVE_PREFIX:
+                    doc["archived_at"] = datetime.now(timezone.utc).isoformat()
+                else:
+                    doc.pop("archived_at", None)
+        if target_prefix != ARCHIVE_PREFIX:
+            # Restored documents have to reach clients syncing with updated_since
+            now = datetime.now(timezone.utc).isoformat()
+            for doc in docs:
+                doc["updated_at"] = now
+        await db[target_prefix + name].bulk_write(
+            [ReplaceOne({"id": doc["id"]}, doc, upsert=True) for doc in docs], ordered=False
+        )
+        await db[source_prefix + name].delete_many({key: project_id})
+        moved += len(docs)
+    return moved
+
+async def archive_closed_projects():
+    """Move completed and cancelled projects with all children to the archive"""
+    result = ArchiveResult()
+    closed = {"status": {"$in": [ProjectStatus.COMPLETED.value, ProjectStatus.CANCELLED.value]}}
+    async for project in db.projects.find(closed, {"id": 1, "status": 1, "restored_status": 1}):
+        if project.get("restored_status") == project["status"]:
+            continue  # Restored on purpose and not closed again since
+        result.documents += await move_project_data(project["id"], "", ARCHIVE_PREFIX)
+        result.project_ids.append(project["id"])
+    if result.project_ids:
+        logger.info(f"Archived {len(result.project_ids)} projects ({result.documents} documents)")
+    return result
+
+# KPI snapshot helpers
+async def setup_kpi_collection():
+    """Create the KPI snapshot collection as a time-series collection if possible"""
+    if KPI_COLLECTION in await db.list_collection_names():
+        return
+    try:
+        await db.create_collection(
+            KPI_COLLECTION,
+            timeseries={"timeField": "ts", "metaField": "project_id", "granularity": "hours"},
+        )
+    except PyMongoError:
+        # MongoDB < 5.0 has no time-series collections, a plain indexed collection works too
+        logger.info(f"Time-series collections not supported, using a regular {KPI_COLLECTION} collection")
+        await db[KPI_COLLECTION].create_index([("project_id", ASCENDING), ("ts", ASCENDING)])
+
+async def snapshot_project_kpis():
+    """Store one KPI snapshot per live project, computed with one aggregation per collection"""
+    ts = datetime.now(timezone.utc)
+    snapshots = {}
+    async for project in db.projects.find({}, {"_id": 0, "id": 1, "lamps": 1}):
+        snapshots[project["id"]] = KpiSnapshot(project_id=project["id"], ts=ts, lamps=project.get("lamps"))
+    if not snapshots:
+        return 0
+
+    budget = db.budget.aggregate([
+        {"$group": {
+            "_id": "$project_id",
+            "plan": {"$sum": "$plan"},
+            "actual": {"$sum": "$actual"},
+            "fc": {"$sum": "$fc"},
+        }}
+    ])
+    async for row in budget:
+        if row["_id"] in snapshots:
+            snapshots[row["_id"]].budget_plan = row["plan"]
+            snapshots[row["_id"]].budget_actual = row["actual"]
+            snapshots[row["_id"]].budget_fc = row["fc"]
+
+    risks = db.risks.aggregate([
+        {"$match": {"status": "open"}},
+        {"$group": {"_id": "$project_id", "score": {"$sum": "$score"}}},
+    ])
+    async for row in risks:
+        if row["_id"] in snapshots:
+            snapshots[row["_id"]].risk_score_open = row["score"]
+
+    tasks = db.tasks.aggregate([
+        {"$group": {"_id": "$project_id", "prog": {"$avg": "$prog"}}},
+    ])
+    async for row in tasks:
+        if row["_id"] in snapshots:
+            snapshots[row["_id"]].task_progress_avg = row["prog"]
+
+    # ts stays a real date here, time-series collections require it
+    await db[KPI_COLLECTION].insert_many([snapshot.dict() for snapshot in snapshots.values()])
+    return len(snapshots)
+
+def trend_bucket(ts: datetime, resolution: TrendResolution):
+    if resolution == TrendResolution.MONTH:
+        return ts.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    day = ts.replace(hour=0, minute=0, second=0, microsecond=0)
+    if resolution == TrendResolution.WEEK:
+        return day - timedelta(days=day.weekday())
+    return day
+
+def downsample_snapshots(snapshots, resolution: TrendResolution):
+    """Keep the last snapshot of each bucket, snapshots must be sorted by ts"""
+    buckets = {}
+    for snapshot in snapshots:
+        ts = snapshot["ts"]
+        if ts.tzinfo is None:
+            ts = ts.replace(tzinfo=timezone.utc)
+        bucket = trend_bucket(ts, resolution)
+        buckets[bucket] = KpiSnapshot(**{**snapshot, "ts": bucket})
+    return list(buckets.values())
+
+# Analytics helpers
+async def get_data_versions(project_ids: List[str]):
+    """History sequence number per project, bumped by every recorded write"""
+    versions = {project_id: 0 for project_id in project_ids}
+    async for counter in db.history_counters.find({"project_id": {"$in": project_ids}}):
+        versions[counter["project_id"]] = counter["seq"]
+    return tuple(sorted(versions.items()))
+
+async def forecast_portfolio(project_ids: List[str], iterations: int, seed: Optional[int] = None):
+    key = (current_tenant.get(), await get_data_versions(project_ids), iterations, seed)
+    result = forecast_cache.get(key)
+    if result is None:
+        query = {"project_id": {"$in": project_ids}}
+        fields = {"_id": 0, "project_id": 1, "p": 1, "a": 1, "category": 1, "status": 1}
+        risks = await db.risks.find(query, fields).to_list(None)
+        budget = await db.budget.find(query, {"_id": 0, "project_id": 1, "plan": 1, "actual": 1, "fc": 1}).to_list(None)
+        milestones = await db.milestones.find(query, {"_id": 0, "project_id": 1, "delta": 1}).to_list(None)
+        portfolio = build_portfolio(project_ids, risks, budget, milestones)
+        # The simulation is CPU bound, keep it off the event loop
+        result = await asyncio.to_thread(simulate, portfolio, iterations, seed)
+        forecast_cache.put(key, result)
+    return PortfolioForecast(**result)
+
+# Consistency checker
+CONSISTENCY_MODELS = {
+    "projects": Project,
+    "milestones": Milestone,
+    "budget": Budget,
+    "risks": Risk,
+    "tasks": Task,
+    "changes": ChangeRequest,
+}
+consistency_locks = {}
+
+def expected_derived_fields(collection: str, obj):
+    """Derived fields as the create/update routes compute them"""
+    if collection == "budget":
+        return {"delta": obj.fc - obj.plan}
+    if collection == "risks":
+        return {"score": obj.p * obj.a}
+    if collection == "milestones":
+        # Stored dates may mix naive and aware values
+        return {"delta": (as_utc(obj.fc) - as_utc(obj.plan)).days if obj.fc else None}
+    return {}
+
+def check_document(collection: str, doc: dict, parent: Optional[str]):
+    """Violations of one document; parent is "live", "archived" or None for the
+    project the document belongs to. Returns (violations, derived fields to fix)."""
+    violations = []
+    fixes = {}
+
+    def violation(kind, detail):
+        violations.append(ConsistencyViolation(
+            collection=collection,
+            doc_id=doc.get("id"),
+            project_id=doc.get("project_id"),
+            kind=kind,
+            detail=detail,
+        ))
+
+    if collection != "projects":
+        if parent is None:
+            violation("orphan", f"Project {doc.get('project_id')} does not exist")
+        elif parent == "archived":
+            violation("archived_parent", f"Project {doc.get('project_id')} is archived")
+
+    # parse_from_mongo keeps unparseable dates as strings
+    bad_dates = []
+    for key in DATE_FIELDS + ["updated_at"]:
+        value = doc.get(key)
+        if isinstance(value, str):
+            try:
+                datetime.fromisoformat(value)
+            except ValueError:
+                bad_dates.append(key)
+    for key in bad_dates:
+        violation("bad_date", f"{key}={doc[key]!r} is not an ISO date")
+    if bad_dates:
+        return violations, fixes
+
+    try:
+        obj = CONSISTENCY_MODELS[collection](**parse_from_mongo(dict(doc)))
+    except ValidationError as e:
+        errors = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()[:5])
+        violation("invalid", errors)
+        return violations, fixes
+
+    for field, expected in expected_derived_fields(collection, obj).items():
+        stored = doc.get(field)
+        if isinstance(expected, float) and isinstance(stored, (int, float)):
+            drifted = abs(stored - expected) > 0.005
+        else:
+            drifted = stored != expected
+        if drifted:
+            violation("drift", f"{field}={stored!r}, expected {expected!r}")
+            fixes[field] = expected
+    return violations, fixes
+
+async def parent_states(project_ids, known: dict):
+    """Fill known[project_id] with "live", "archived" or None"""
+    missing = sorted({p for p in project_ids if p and p not in known})
+    if not missing:
+        return
+    live = set(await db.projects.distinct("id", {"id": {"$in": missing}}))
+    archived = set(await db[ARCHIVE_PREFIX + "projects"].distinct("id", {"id": {"$in": missing}}))
+    for project_id in missing:
+        known[project_id] = "live" if project_id in live else "archived" if project_id in archived else None
+
+def after_checkpoint(checkpoint):
+    """Documents sorted after the checkpoint in (updated_at, id) order"""
+    if not checkpoint:
+        return {}
+    ts, last_id = checkpoint.get("updated_at"), checkpoint["id"]
+    if ts is None:
+        return {"$or": [{"updated_at": None, "id": {"$gt": last_id}}, {"updated_at": {"$ne": None}}]}
+    return {"$or": [{"updated_at": {"$gt": ts}}, {"updated_at": ts, "id": {"$gt": last_id}}]}
+
+async def check_batch(collection: str, docs: list, report: ConsistencyReport, known: dict, repair: bool):
+    if collection != "projects":
+        await parent_states([doc.get("project_id") for doc in docs], known)
+    for doc in docs:
+        parent = known.get(doc.get("project_id")) if collection != "projects" else "live"
+        try:
+            violations, fixes = check_document(collection, doc, parent)
+        except Exception as e:
+            # One broken document must not abort the whole run
+            violations, fixes = [ConsistencyViolation(
+                collection=collection,
+                doc_id=doc.get("id"),
+                project_id=doc.get("project_id"),
+                kind="invalid",
+                detail=f"{type(e).__name__}: {e}",
+            )], {}
+        if repair and doc.get("id"):
+            if any(v.kind == "orphan" for v in violations):
+                await db[collection].delete_one({"id": doc["id"]})
+                await record_history(doc.get("project_id") or doc["id"], collection, doc["id"], doc, None)
+                for v in violations:
+                    v.repaired = True
+            elif fixes:
+                update = {**fixes, "updated_at": datetime.now(timezone.utc).isoformat()}
+                await db[collection].update_one({"id": doc["id"]}, {"$set": update})
+                await record_history(doc.get("project_id") or doc["id"], collection, doc["id"], doc, {**doc, **update})
+                for v in violations:
+                    v.repaired = v.repaired or v.kind == "drift"
+        for v in violations:
+            report.counts[v.kind] = report.counts.get(v.kind, 0) + 1
+            if len(report.violations) < CONSISTENCY_MAX_VIOLATIONS:
+                report.violations.append(v)
+            else:
+                report.truncated = True
+    report.scanned[collection] = report.scanned.get(collection, 0) + len(docs)
+
+async def scan_collection(collection: str, query: dict, report: ConsistencyReport, known: dict, repair: bool, checkpoint: bool):
+    """Stream a collection in (updated_at, id) order, checkpointing after every batch"""
+    cursor = db[collection].find(query, {"_id": 0}).sort([("updated_at", ASCENDING), ("id", ASCENDING)])
+    batch = []
+    async for doc in cursor.batch_size(CONSISTENCY_BATCH_SIZE):
+        batch.append(doc)
+        if len(batch) >= CONSISTENCY_BATCH_SIZE:
+            await check_batch(collection, batch, report, known, repair)
+            if checkpoint:
+                await save_consistency_checkpoint(collection, batch[-1])
+            batch = []
+    if batch:
+        await check_batch(collection, batch, report, known, repair)
+        if checkpoint:
+            await save_consistency_checkpoint(collection, batch[-1])
+
+async def save_consistency_checkpoint(collection: str, doc: dict):
+    await db.consistency_checkpoints.update_one(
+        {"collection": collection},
+        {"$set": {"updated_at": doc.get("updated_at"), "id": doc.get("id") or ""}},
+        upsert=True,
+    )
+
+async def check_consistency(incremental: bool = True, repair: bool = False):
+    """Check all live collections against the models, parents and derived fields.
+
+    The incremental mode only scans documents changed since the last checkpoint
+    plus the children of projects deleted since then, and resumes where an
+    interrupted run stopped. A full run rescans everything and resets the
+    checkpoints.
+    """
+    lock = consistency_locks.setdefault(current_tenant.get(), asyncio.Lock())
+    async with lock:
+        report = ConsistencyReport(incremental=incremental, repair=repair)
+        checkpoints = {}
+        if incremental:
+            checkpoints = {cp["collection"]: cp async for cp in db.consistency_checkpoints.find({}, {"_id": 0})}
+        known = {}
+
+        # Deleting a project does not touch its children, so their updated_at
+        # does not move: look them up through the deletions in the history
+        deleted_query = {"collection": "projects", "op": "delete"}
+        if "deleted_projects" in checkpoints:
+            deleted_query["ts"] = {"$gt": checkpoints["deleted_projects"]["ts"]}
+        deleted = await db.project_history.find(deleted_query, {"_id": 0, "project_id": 1, "ts": 1}).sort("ts", ASCENDING).to_list(None)
+
+        for collection in HISTORY_COLLECTIONS:
+            await scan_collection(
+                collection, after_checkpoint(checkpoints.get(collection)), report, known, repair, checkpoint=True
+            )
+        if incremental and deleted:
+            # Children already seen above are checked once more, which is harmless
+            deleted_ids = sorted({entry["project_id"] for entry in deleted})
+            for collection in HISTORY_COLLECTIONS[1:]:
+                await scan_collection(
+                    collection, {"project_id": {"$in": deleted_ids}}, report, known, repair, checkpoint=False
+                )
+        if deleted:
+            await db.consistency_checkpoints.update_one(
+                {"collection": "deleted_projects"}, {"$set": {"ts": deleted[-1]["ts"]}}, upsert=True
+            )
+
+        report.finished_at = datetime.now(timezone.utc)
+        await db.consistency_runs.insert_one(prepare_for_mongo(report.dict()))
+        if report.counts:
+            logger.warning(f"Consistency check found {report.counts}")
+        return report
+
+async def check_consistency_incrementally():
+    return await check_consistency(incremental=True, repair=CONSISTENCY_AUTO_REPAIR)
+
+report_pool = None
+pending_report_refreshes = {}
+
+def get_report_pool():
+    # spawn, forking the event loop and the Mongo client threads is not safe
+    global report_pool
+    if report_pool is None:
+        report_pool = ProcessPoolExecutor(REPORT_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return report_pool
+
+async def load_report_data(project_id: str):
+    """Project data shown in the PDF report and its content hash"""
+    state = await load_live_state(project_id)
+    if not state["projects"]:
+        state = await load_live_state(project_id, ARCHIVE_PREFIX)
+    project = state["projects"].get(project_id)
+    if not project:
+        return None, None
+    data = {"project": project}
+    for name in ["milestones", "budget", "risks", "tasks"]:
+        data[name] = sorted(state[name].values(), key=lambda doc: doc["id"])
+    # The report is as of its last change, so the same data renders the same PDF
+    data["as_of"] = max(
+        [str(project.get("updated_at") or "")]
+        + [str(doc.get("updated_at") or "") for name in ["milestones", "budget", "risks", "tasks"] for doc in data[name]]
+    )
+    # Plain JSON values (enum values, ISO dates) for the worker processes
+    content = json.dumps([LAYOUT_VERSION, data], sort_keys=True, default=str)
+    return json.loads(content)[1], hashlib.sha256(content.encode()).hexdigest()
+
+def report_dir(project_id: str):
+    # Ids come from clients, hashed they can never leave the cache directory
+    return REPORT_CACHE_DIR / current_tenant.get() / hashlib.sha256(project_id.encode()).hexdigest()
+
+async def render_report(project_id: str, data: dict, digest: str):
+    """Bytes of the cached PDF, rendered in the worker pool if missing"""
+    path = report_dir(project_id) / f"{digest}.pdf"
+    try:
+        return path.read_bytes()
+    except FileNotFoundError:
+        pass  # Not rendered yet, or replaced by a refresh in the meantime
+
+    async def render():
+        pdf = await asyncio.get_running_loop().run_in_executor(get_report_pool(), render_status_report, data)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{digest}.{uuid.uuid4().hex}.tmp")
+        tmp.write_bytes(pdf)
+        os.replace(tmp, path)
+        # Older versions of the report are not needed any more
+        for old in path.parent.glob("*.pdf"):
+            if old != path and old.stat().st_mtime <= path.stat().st_mtime:
+                old.unlink(missing_ok=True)
+        return pdf
+
+    return await report_renders.do((current_tenant.get(), project_id, digest), render)
+
+def schedule_report_refresh(project_id: str):
+    """Render an already cached report again after a write, once per burst of writes"""
+    key = (current_tenant.get(), project_id)
+    if render_status_report is None or key in pending_report_refreshes:
+        return
+    if not report_dir(project_id).is_dir():
+        # Nobody has asked for this report yet, which also covers writes
+        # naming projects that do not exist
+        return
+    pending_report_refreshes[key] = asyncio.create_task(refresh_report(project_id))
+
+async def refresh_report(project_id: str):
+    await asyncio.sleep(REPORT_RENDER_DELAY)
+    # Writes from here on schedule another refresh
+    pending_report_refreshes.pop((current_tenant.get(), project_id), None)
+    try:
+        data, digest = await load_report_data(project_id)
+        if data is not None:
+            await render_report(project_id, data, digest)
+    except Exception:
+        logger.exception(f"Rendering the report of project {project_id} failed")
+
+@contextmanager
+def use_tenant(tenant: str):
+    token = current_tenant.set(tenant)
+    try:
+        yield
+    finally:
+        current_tenant.reset(token)
+
+async def known_tenants():
+    """Default tenant, configured tenants and registered tenants"""
+    registered = await tenant_database(DEFAULT_TENANT).tenants.distinct("id")
+    return list(dict.fromkeys([DEFAULT_TENANT, *TENANTS, *sorted(registered)]))
+
+async def tenant_accepted(tenant: str):
+    if tenant == DEFAULT_TENANT or tenant in TENANTS or await tenant_registry.contains(tenant):
+        return True
+    if TENANT_AUTO_REGISTER:
+        await tenant_registry.register(tenant)
+        return True
+    return False
+
+async def setup_tenant(tenant: str):
+    with use_tenant(tenant):
+        await create_indexes()
+        await setup_kpi_collection()
+    ready_tenants.add(tenant)
+
+async def ensure_tenant(tenant: str):
+    """Create indexes and collections of a tenant on its first request"""
+    if tenant not in ready_tenants:
+        await tenant_setups.do(tenant, lambda: setup_tenant(tenant))
+
+async def claim_job_run(name: str, interval: timedelta):
+    """Start time of the run claimed for this worker, or of the last run if it
+    is not due yet. The claim is one atomic update, so with several workers
+    only one of them runs the job."""
+    now = datetime.now(timezone.utc)
+    try:
+        # Without a due run the upsert collides with the unique job index
+        await db.job_runs.find_one_and_update(
+            {"job": name, "last_run": {"$lt": iso_utc(now - interval)}},
+            {"$set": {"last_run": now.isoformat()}},
+            upsert=True,
+        )
+        return True, now
+    except DuplicateKeyError:
+        pass  # Not due yet, or another worker claimed it first
+    run = await db.job_runs.find_one({"job": name}, {"_id": 0, "last_run": 1})
+    return False, as_utc(datetime.fromisoformat(run["last_run"]))
+
+async def run_periodically(interval_hours: float, job):
+    """Run the job for every tenant whose last run is older than the interval.
+
+    Runs are recorded in job_runs when they start, so a restart catches up on
+    an overdue run right away instead of waiting another full interval, and a
+    failed or interrupted run waits for the next one.
+    """
+    interval = timedelta(hours=interval_hours)
+    while True:
+        next_run = datetime.now(timezone.utc) + interval
+        for tenant in await known_tenants():
+            with use_tenant(tenant):
+                try:
+                    claimed, last_run = await claim_job_run(job.__name__, interval)
+                    if claimed:
+                        await job()
+                    next_run = min(next_run, last_run + interval)
+                except Exception:
+                    logger.exception(f"Background job {job.__name__} failed for tenant {tenant}")
+        await asyncio.sleep(max((next_run - datetime.now(timezone.utc)).total_seconds(), 1))
+
 # Project Routes
 @api_router.post("/projects", response_model=Project)
 async def create_project(project: ProjectCreate):
@@ -243,16 +1651,25 @@ async def create_project(project: ProjectCreate):
     project_obj = Project(**project_dict)
     project_data = prepare_for_mongo(project_obj.dict())
     await db.projects.insert_one(project_data)
+    await record_history(project_obj.id, "projects", project_obj.id, None, project_data)
     return project_obj
 
 @api_router.get("/projects", response_model=List[Project])
-async def get_projects():
-    projects = await db.projects.find().to_list(1000)
-    return [Project(**parse_from_mongo(project)) for project in projects]
+async def get_projects(
+    request: Request,
+    include_archived: bool = False,
+    updated_since: Optional[datetime] = None,
+    status: Optional[ProjectStatus] = None,
+    params: ListParams = Depends(),
+):
+    query = with_filters(with_updated_since({}, updated_since), status=status.value if status else None)
+    return await list_documents(request, Project, "projects", query, include_archived, params)
 
 @api_router.get("/projects/{project_id}", response_model=Project)
-async def get_project(project_id: str):
+async def get_project(project_id: str, include_archived: bool = False):
     project = await db.projects.find_one({"id": project_id})
+    if not project and include_archived:
+        project = await db[ARCHIVE_PREFIX + "projects"].find_one({"id": project_id}, {"archived_at": 0})
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     return Project(**parse_from_mongo(project))
@@ -261,41 +1678,227 @@ async def get_project(project_id: str):
 async def update_project(project_id: str, project_update: ProjectCreate):
     project_dict = project_update.dict()
     project_dict["id"] = project_id
+    before = await db.projects.find_one({"id": project_id}, {"_id": 0})
+    if before and before.get("restored_status") == project_dict["status"]:
+        project_dict["restored_status"] = before["restored_status"]
     project_obj = Project(**project_dict)
     project_data = prepare_for_mongo(project_obj.dict())
-    
+
     result = await db.projects.replace_one({"id": project_id}, project_data)
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Project not found")
+    await record_history(project_id, "projects", project_id, before, project_data)
     return project_obj
 
 @api_router.delete("/projects/{project_id}")
 async def delete_project(project_id: str):
+    before = await db.projects.find_one({"id": project_id}, {"_id": 0})
     result = await db.projects.delete_one({"id": project_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Project not found")
+    await record_history(project_id, "projects", project_id, before, None)
     return {"message": "Project deleted successfully"}
 
+@api_router.get("/projects/{project_id}/history", response_model=List[HistoryEntry])
+async def get_project_history(
+    project_id: str,
+    since: Optional[datetime] = None,
+    limit: int = Query(100, ge=1, le=1000),
+):
+    query = {"project_id": project_id}
+    if since:
+        query["ts"] = {"$gt": iso_utc(since)}
+    cursor = db.project_history.find(query).sort([("ts", ASCENDING), ("seq", ASCENDING)]).limit(limit)
+    entries = await cursor.to_list(limit)
+    return [HistoryEntry(**parse_from_mongo(entry)) for entry in entries]
+
+@api_router.get("/projects/{project_id}/report", response_model=ProjectReport)
+async def get_project_report(project_id: str, as_of: Optional[datetime] = None):
+    if as_of is None:
+        as_of = datetime.now(timezone.utc)
+        state = await load_live_state(project_id)
+        if not state["projects"]:
+            state = await load_live_state(project_id, ARCHIVE_PREFIX)
+    else:
+        state = await build_project_state(project_id, iso_utc(as_of))
+    report = report_from_state(state, project_id, as_of)
+    if not report:
+        raise HTTPException(status_code=404, detail="Project not found")
+    return report
+
+@api_router.get("/projects/{project_id}/report.pdf")
+async def get_project_report_pdf(project_id: str, request: Request):
+    """One-page status report, served from the disk cache while the data is unchanged"""
+    if render_status_report is None:
+        raise HTTPException(status_code=501, detail="PDF reports need the reportlab package")
+    data, digest = await load_report_data(project_id)
+    if data is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+    headers = {"ETag": f'"{digest}"', "Cache-Control": "no-cache"}
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+    pdf = await render_report(project_id, data, digest)
+    headers["Content-Disposition"] = f'inline; filename="status-{project_id}.pdf"'
+    return Response(pdf, media_type="application/pdf", headers=headers)
+
+@api_router.post("/projects/{project_id}/restore", response_model=Project)
+async def restore_project(project_id: str):
+    project = await db[ARCHIVE_PREFIX + "projects"].find_one({"id": project_id}, {"_id": 0, "archived_at": 0})
+    if not project:
+        raise HTTPException(status_code=404, detail="Archived project not found")
+    await move_project_data(project_id, ARCHIVE_PREFIX, "")
+    project["restored_status"] = project["status"]
+    await db.projects.update_one({"id": project_id}, {"$set": {"restored_status": project["status"]}})
+    return Project(**parse_from_mongo(project))
+
+@api_router.post("/archive/run", response_model=ArchiveResult)
+async def run_archive():
+    return await archive_closed_projects()
+
+@api_router.post("/consistency/check", response_model=ConsistencyReport)
+async def run_consistency_check(incremental: bool = True, repair: bool = False):
+    return await check_consistency(incremental=incremental, repair=repair)
+
+@api_router.get("/consistency/runs", response_model=List[ConsistencyReport])
+async def get_consistency_runs(limit: int = Query(10, ge=1, le=100)):
+    runs = await db.consistency_runs.find({}, {"_id": 0}).sort("started_at", DESCENDING).to_list(limit)
+    return [ConsistencyReport(**run) for run in runs]
+
+@api_router.get("/projects/{project_id}/trends", response_model=List[KpiSnapshot])
+async def get_project_trends(
+    project_id: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    resolution: TrendResolution = TrendResolution.DAY,
+):
+    query = {"project_id": project_id}
+    if start or end:
+        query["ts"] = {}
+        if start:
+            query["ts"]["$gte"] = start
+        if end:
+            query["ts"]["$lte"] = end
+    snapshots = await db[KPI_COLLECTION].find(query, {"_id": 0}).sort("ts", ASCENDING).to_list(None)
+    return downsample_snapshots(snapshots, resolution)
+
+@api_router.post("/trends/snapshot")
+async def run_kpi_snapshot():
+    count = await snapshot_project_kpis()
+    return {"message": f"Stored KPI snapshots for {count} projects"}
+
+@api_router.get("/analytics/forecast", response_model=PortfolioForecast)
+async def get_forecast(
+    response: Response,
+    project_id: Optional[List[str]] = Query(None),
+    iterations: int = Query(100000, ge=100, le=FORECAST_MAX_ITERATIONS),
+    seed: Optional[int] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(FORECAST_PAGE_SIZE, ge=1, le=FORECAST_MAX_PROJECTS),
+):
+    """Forecast of one page of projects (sorted by id), the portfolio totals
+    cover that page. X-Total-Count is the number of projects on all pages.
+    With many iterations a page holds fewer than limit projects."""
+    limit = min(limit, max(1, FORECAST_MAX_PROJECT_ITERATIONS // iterations))
+    if project_id:
+        project_ids = sorted(set(project_id))
+    else:
+        project_ids = sorted([p["id"] async for p in db.projects.find({}, {"_id": 0, "id": 1})])
+    response.headers["X-Total-Count"] = str(len(project_ids))
+    return await forecast_portfolio(project_ids[skip:skip + limit], iterations, seed)
+
+@api_router.get("/projects/{project_id}/schedule", response_model=ProjectSchedule)
+async def get_project_schedule(project_id: str):
+    graph, seq = await load_schedule_graph(project_id)
+    try:
+        order = graph.order()
+    except CycleError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if any(task_id not in graph.ef for task_id in order):
+        graph.forward()
+    else:
+        # Forecasts computed here are not stored, such a graph is not kept
+        await keep_schedule_graph(project_id, graph, seq)
+    ls, lf, slack = graph.backward()
+    result = ProjectSchedule(project_id=project_id)
+    for task_id in order:
+        critical = slack[task_id] <= timedelta(0)
+        result.tasks.append(ScheduleEntry(
+            task_id=task_id,
+            es=graph.es[task_id],
+            ef=graph.ef[task_id],
+            ls=ls[task_id],
+            lf=lf[task_id],
+            slack_days=slack[task_id].total_seconds() / 86400,
+            critical=critical,
+        ))
+        if critical:
+            result.critical_path.append(task_id)
+    if order:
+        result.finish = max(graph.ef[task_id] for task_id in order)
+    return result
+
+@api_router.post("/projects/{project_id}/schedule/recalculate", response_model=ProjectSchedule)
+async def recalculate_project_schedule(project_id: str):
+    graph, seq = await load_schedule_graph(project_id)
+    try:
+        graph.order()
+    except CycleError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    recorded = await reschedule(project_id, graph)
+    await keep_schedule_graph(project_id, graph, seq + recorded)
+    return await get_project_schedule(project_id)
+
 # Milestone Routes
 @api_router.post("/milestones", response_model=Milestone)
 async def create_milestone(milestone: MilestoneCreate):
     milestone_dict = milestone.dict()
     milestone_obj = Milestone(**milestone_dict)
-    
+
+    # Only tasks of the same project are rescheduled together with the milestone
+    if milestone_obj.task_ids:
+        found = await db.tasks.distinct(
+            "id", {"id": {"$in": milestone_obj.task_ids}, "project_id": milestone_obj.project_id}
+        )
+        missing = set(milestone_obj.task_ids) - set(found)
+        if missing:
+            raise HTTPException(
+                status_code=400, detail=f"Tasks not in project {milestone_obj.project_id}: {', '.join(sorted(missing))}"
+            )
+
+    # Forecast from the linked tasks unless given explicitly
+    if milestone_obj.task_ids and not milestone_obj.fc:
+        tasks = await db.tasks.find(
+            {"id": {"$in": milestone_obj.task_ids}, "project_id": milestone_obj.project_id, "fc_due": {"$ne": None}},
+            {"_id": 0, "fc_due": 1},
+        ).to_list(None)
+        if tasks:
+            milestone_obj.fc = max(as_utc(datetime.fromisoformat(t["fc_due"])) for t in tasks)
+            milestone_obj.plan = as_utc(milestone_obj.plan)
+
     # Calculate delta if fc is provided
     if milestone_obj.fc and milestone_obj.plan:
         delta_days = (milestone_obj.fc - milestone_obj.plan).days
         milestone_obj.delta = delta_days
     
     milestone_data = prepare_for_mongo(milestone_obj.dict())
+    await add_person_keys(milestone_data, "owner")
     await db.milestones.insert_one(milestone_data)
+    await record_history(milestone_obj.project_id, "milestones", milestone_obj.id, None, milestone_data)
     return milestone_obj
 
 @api_router.get("/milestones", response_model=List[Milestone])
-async def get_milestones(project_id: Optional[str] = None):
-    query = {"project_id": project_id} if project_id else {}
-    milestones = await db.milestones.find(query).to_list(1000)
-    return [Milestone(**parse_from_mongo(milestone)) for milestone in milestones]
+async def get_milestones(
+    request: Request,
+    project_id: Optional[List[str]] = Query(None),
+    include_archived: bool = False,
+    updated_since: Optional[datetime] = None,
+    owner: Optional[str] = None,
+    status: Optional[str] = None,
+    params: ListParams = Depends(),
+):
+    query = with_updated_since(project_query(project_id), updated_since)
+    query = with_filters(query, owner=owner, status=status)
+    return await list_documents(request, Milestone, "milestones", query, include_archived, params)
 
 # Budget Routes
 @api_router.post("/budget", response_model=Budget)
@@ -308,13 +1911,19 @@ async def create_budget(budget: BudgetCreate):
     
     budget_data = prepare_for_mongo(budget_obj.dict())
     await db.budget.insert_one(budget_data)
+    await record_history(budget_obj.project_id, "budget", budget_obj.id, None, budget_data)
     return budget_obj
 
 @api_router.get("/budget", response_model=List[Budget])
-async def get_budget(project_id: Optional[str] = None):
-    query = {"project_id": project_id} if project_id else {}
-    budget_items = await db.budget.find(query).to_list(1000)
-    return [Budget(**parse_from_mongo(item)) for item in budget_items]
+async def get_budget(
+    request: Request,
+    project_id: Optional[List[str]] = Query(None),
+    include_archived: bool = False,
+    updated_since: Optional[datetime] = None,
+    params: ListParams = Depends(),
+):
+    query = with_updated_since(project_query(project_id), updated_since)
+    return await list_documents(request, Budget, "budget", query, include_archived, params)
 
 # Risk Routes
 @api_router.post("/risks", response_model=Risk)
@@ -326,29 +1935,77 @@ async def create_risk(risk: RiskCreate):
     risk_obj.score = risk_obj.p * risk_obj.a
     
     risk_data = prepare_for_mongo(risk_obj.dict())
+    await add_person_keys(risk_data, "owner")
     await db.risks.insert_one(risk_data)
+    await record_history(risk_obj.project_id, "risks", risk_obj.id, None, risk_data)
     return risk_obj
 
 @api_router.get("/risks", response_model=List[Risk])
-async def get_risks(project_id: Optional[str] = None):
-    query = {"project_id": project_id} if project_id else {}
-    risks = await db.risks.find(query).to_list(1000)
-    return [Risk(**parse_from_mongo(risk)) for risk in risks]
+async def get_risks(
+    request: Request,
+    project_id: Optional[List[str]] = Query(None),
+    include_archived: bool = False,
+    updated_since: Optional[datetime] = None,
+    owner: Optional[str] = None,
+    status: Optional[str] = None,
+    params: ListParams = Depends(),
+):
+    query = with_updated_since(project_query(project_id), updated_since)
+    query = with_filters(query, owner=owner, status=status)
+    return await list_documents(request, Risk, "risks", query, include_archived, params)
 
 # Task Routes
 @api_router.post("/tasks", response_model=Task)
 async def create_task(task: TaskCreate):
     task_dict = task.dict()
     task_obj = Task(**task_dict)
+    graph, seq = await check_dependencies(task_obj)
     task_data = prepare_for_mongo(task_obj.dict())
+    await add_person_keys(task_data, "owner")
     await db.tasks.insert_one(task_data)
+    entry = await record_history(task_obj.project_id, "tasks", task_obj.id, None, task_data)
+    recorded = await reschedule(task_obj.project_id, graph, [task_obj.id])
+    await keep_schedule_graph(task_obj.project_id, graph, seq + bool(entry) + recorded)
+    task_obj.fc_start, task_obj.fc_due = graph.es[task_obj.id], graph.ef[task_obj.id]
+    return task_obj
+
+@api_router.put("/tasks/{task_id}", response_model=Task)
+async def update_task(task_id: str, task_update: TaskCreate):
+    before = await db.tasks.find_one({"id": task_id}, {"_id": 0})
+    if not before:
+        raise HTTPException(status_code=404, detail="Task not found")
+    task_dict = task_update.dict()
+    task_dict["id"] = task_id
+    task_obj = Task(**task_dict)
+    graph, seq = await check_dependencies(task_obj)
+    # Forecasts stay until the forward pass below moves them
+    task_obj.fc_start, task_obj.fc_due = graph.es.get(task_id), graph.ef.get(task_id)
+    task_data = prepare_for_mongo(task_obj.dict())
+    await add_person_keys(task_data, "owner")
+    await db.tasks.replace_one({"id": task_id}, task_data)
+    entry = await record_history(task_obj.project_id, "tasks", task_id, before, task_data)
+    recorded = await reschedule(task_obj.project_id, graph, [task_id])
+    await keep_schedule_graph(task_obj.project_id, graph, seq + bool(entry) + recorded)
+    if before.get("project_id") != task_obj.project_id:
+        # The history of the old project does not see the task leave
+        schedule_graphs.pop((current_tenant.get(), before.get("project_id")))
+    task_obj.fc_start, task_obj.fc_due = graph.es[task_id], graph.ef[task_id]
     return task_obj
 
 @api_router.get("/tasks", response_model=List[Task])
-async def get_tasks(project_id: Optional[str] = None):
-    query = {"project_id": project_id} if project_id else {}
-    tasks = await db.tasks.find(query).to_list(1000)
-    return [Task(**parse_from_mongo(task)) for task in tasks]
+async def get_tasks(
+    request: Request,
+    project_id: Optional[List[str]] = Query(None),
+    include_archived: bool = False,
+    updated_since: Optional[datetime] = None,
+    owner: Optional[str] = None,
+    status: Optional[str] = None,
+    risk_level: Optional[str] = None,
+    params: ListParams = Depends(),
+):
+    query = with_updated_since(project_query(project_id), updated_since)
+    query = with_filters(query, owner=owner, status=status, risk_level=risk_level)
+    return await list_documents(request, Task, "tasks", query, include_archived, params)
 
 # Change Request Routes
 @api_router.post("/changes", response_model=ChangeRequest)
@@ -356,14 +2013,276 @@ async def create_change_request(change: ChangeRequestCreate):
     change_dict = change.dict()
     change_obj = ChangeRequest(**change_dict)
     change_data = prepare_for_mongo(change_obj.dict())
+    await add_person_keys(change_data, "requester", "decision_maker")
     await db.changes.insert_one(change_data)
+    await record_history(change_obj.project_id, "changes", change_obj.id, None, change_data)
     return change_obj
 
 @api_router.get("/changes", response_model=List[ChangeRequest])
-async def get_change_requests(project_id: Optional[str] = None):
-    query = {"project_id": project_id} if project_id else {}
-    changes = await db.changes.find(query).to_list(1000)
-    return [ChangeRequest(**parse_from_mongo(change)) for change in changes]
+async def get_change_requests(
+    request: Request,
+    project_id: Optional[List[str]] = Query(None),
+    include_archived: bool = False,
+    updated_since: Optional[datetime] = None,
+    status: Optional[str] = None,
+    priority: Optional[str] = None,
+    params: ListParams = Depends(),
+):
+    query = with_updated_since(project_query(project_id), updated_since)
+    query = with_filters(query, status=status, priority=priority)
+    return await list_documents(request, ChangeRequest, "changes", query, include_archived, params)
+
+# Sync Routes
+@api_router.get("/sync", response_model=SyncResponse)
+async def sync(
+    updated_since: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(SYNC_PAGE_SIZE, ge=1, le=SYNC_MAX_PAGE_SIZE),
+):
+    """Everything changed since the client's watermark, or everything for a first
+    sync, in pages of at most limit documents. While has_more is set the client
+    fetches the next page with the returned cursor and only keeps the watermark
+    once the last page is in."""
+    if cursor:
+        try:
+            position = SyncCursor.parse_raw(base64.urlsafe_b64decode(cursor.encode()))
+        except (ValueError, ValidationError):
+            raise HTTPException(status_code=400, detail="Invalid sync cursor")
+        since = position.since
+    else:
+        since = updated_since - timedelta(seconds=SYNC_OVERLAP_SECONDS) if updated_since else None
+        position = SyncCursor(watermark=datetime.now(timezone.utc), since=since, collection="projects")
+    query = with_updated_since({}, since)
+    result = SyncResponse(watermark=position.watermark, full=since is None and not cursor)
+
+    # Projects first, children in the order of CHILD_MODELS
+    models = {"projects": Project, **{collection.value: model for collection, model in CHILD_MODELS.items()}}
+    names = list(models)
+    remaining = limit
+    for name in names[names.index(position.collection):]:
+        checkpoint = {"updated_at": position.updated_at, "id": position.id} if name == position.collection and position.id else None
+        docs = await db[name].find({**query, **after_checkpoint(checkpoint)}, {"_id": 0}).sort(
+            [("updated_at", ASCENDING), ("id", ASCENDING)]
+        ).limit(remaining).to_list(remaining)
+        setattr(result, name, [models[name](**parse_from_mongo(doc)) for doc in docs])
+        remaining -= len(docs)
+        if remaining == 0:
+            # A full page, the next one continues after its last document
+            last = docs[-1]
+            next_position = SyncCursor(
+                watermark=position.watermark, since=since, collection=name,
+                updated_at=last.get("updated_at"), id=last["id"],
+            )
+            result.has_more = True
+            result.cursor = base64.urlsafe_b64encode(next_position.json().encode()).decode()
+            break
+
+    # With the last page, so that no later page brings back children of
+    # deleted projects
+    if since and not result.has_more:
+        deletes = db.project_history.find({"op": "delete", "ts": {"$gt": iso_utc(since)}}, {"collection": 1, "doc_id": 1})
+        async for entry in deletes:
+            result.deleted.setdefault(entry["collection"], []).append(entry["doc_id"])
+        archived = db[ARCHIVE_PREFIX + "projects"].find({"archived_at": {"$gt": iso_utc(since)}}, {"id": 1})
+        result.removed_projects = [doc["id"] async for doc in archived]
+    return result
+
+# Batch Routes
+CHILD_MODELS = {
+    ChildCollection.MILESTONES: Milestone,
+    ChildCollection.BUDGET: Budget,
+    ChildCollection.RISKS: Risk,
+    ChildCollection.TASKS: Task,
+    ChildCollection.CHANGES: ChangeRequest,
+}
+
+async def stream_grouped(collection: ChildCollection, project_ids: List[str], include_archived: bool):
+    """NDJSON lines {"project_id": ..., "items": [...]}, one per project"""
+    model = CHILD_MODELS[collection]
+    query = project_query(project_ids)
+    sources = [collection.value] + ([ARCHIVE_PREFIX + collection.value] if include_archived else [])
+    for source in sources:
+        current, items = None, []
+        cursor = db[source].find(query, {"_id": 0}).sort("project_id", ASCENDING)
+        async for doc in cursor:
+            if doc["project_id"] != current and items:
+                yield json.dumps({"project_id": current, "items": items}) + "\n"
+                items = []
+            current = doc["project_id"]
+            items.append(jsonable_encoder(model(**parse_from_mongo(doc))))
+        if items:
+            yield json.dumps({"project_id": current, "items": items}) + "\n"
+
+@api_router.post("/{collection}/batch")
+async def get_children_batch(collection: ChildCollection, batch: BatchRequest, request: Request):
+    if "application/x-ndjson" in request.headers.get("accept", ""):
+        return StreamingResponse(
+            stream_grouped(collection, batch.project_ids, batch.include_archived),
+            media_type="application/x-ndjson",
+        )
+
+    model = CHILD_MODELS[collection]
+    docs = await find_documents(collection.value, project_query(batch.project_ids), batch.include_archived, limit=None)
+    grouped: Dict[str, list] = {project_id: [] for project_id in batch.project_ids}
+    for doc in docs:
+        grouped.setdefault(doc["project_id"], []).append(model(**parse_from_mongo(doc)))
+    return grouped
+
+# People Routes
+@api_router.get("/people", response_model=List[Person])
+async def get_people():
+    people = await db.people.find({}, {"_id": 0}).sort("key", ASCENDING).to_list(None)
+    return [Person(**person) for person in people]
+
+@api_router.post("/people", response_model=Person)
+async def create_person(person: PersonCreate):
+    person_obj = Person(key=person_key(person.name), **person.dict())
+    person_obj.name = " ".join(person.name.split())
+    person_obj.aliases = [person_key(alias) for alias in person.aliases]
+    existing = await db.people.find_one({"key": person_obj.key})
+    if existing:
+        person_obj.id = existing["id"]
+    await db.people.replace_one({"key": person_obj.key}, person_obj.dict(), upsert=True)
+
+    # Spellings that are now aliases were people of their own so far: they are
+    # merged into this person and their documents re-keyed
+    aliases = [alias for alias in person_obj.aliases if alias != person_obj.key]
+    if aliases:
+        await db.people.update_many(
+            {"key": {"$ne": person_obj.key}, "aliases": {"$in": aliases}}, {"$pull": {"aliases": {"$in": aliases}}}
+        )
+        await db.people.delete_many({"key": {"$in": aliases}})
+        for collection, fields in PERSON_FIELDS.items():
+            for field in fields:
+                await db[collection].update_many(
+                    {f"{field}_key": {"$in": aliases}}, {"$set": {f"{field}_key": person_obj.key}}
+                )
+    return person_obj
+
+@api_router.post("/people/rebuild")
+async def rebuild_people():
+    """Backfill the *_key fields of documents written before the registry existed"""
+    updated = 0
+    for collection, fields in PERSON_FIELDS.items():
+        projection = {"_id": 0, "id": 1, **{field: 1 for field in fields}}
+        async for doc in db[collection].find({}, projection):
+            keys = await add_person_keys({field: doc.get(field) for field in fields}, *fields)
+            keys = {k: v for k, v in keys.items() if k.endswith("_key")}
+            await db[collection].update_one({"id": doc["id"]}, {"$set": keys})
+            updated += 1
+    return {"message": f"Updated person keys of {updated} documents"}
+
+@api_router.get("/workload", response_model=List[OwnerWorkload])
+async def get_workload(
+    owner: Optional[List[str]] = Query(None),
+    start: Optional[datetime] = None,
+    weeks: int = Query(4, ge=1, le=52),
+):
+    """Open tasks due per week, open risks and pending change decisions per person"""
+    first_week = week_start(as_utc(start) if start else datetime.now(timezone.utc))
+    end = first_week + timedelta(weeks=weeks)
+    keys = await registry_keys(owner) if owner else None
+
+    def person_match(field):
+        return {field: {"$in": keys}} if keys else {field: {"$ne": None}}
+
+    def count_by(person, kind, due):
+        return [
+            {"$project": {"person": person, "kind": {"$literal": kind}, "due": due}},
+            {"$group": {"_id": {"person": "$person", "kind": "$kind", "due": "$due"}, "count": {"$sum": 1}}},
+        ]
+
+    # One aggregation per collection, run concurrently, grouped by person, kind and
+    # due date. Risks and change decisions have no due date and count for the first
+    # week. Due dates are ISO strings, naive or with an offset, so they cannot be
+    # compared as strings: the match only narrows down by date with a day of
+    # margin and the exact week is computed from the parsed date below.
+    pipelines = [
+        (db.tasks, [{"$match": {
+            **person_match("owner_key"),
+            "due": {
+                "$gte": (first_week - timedelta(days=1)).date().isoformat(),
+                "$lt": (end + timedelta(days=1)).date().isoformat(),
+            },
+            "prog": {"$lt": 100},
+        }}] + count_by("$owner_key", "tasks", "$due")),
+        (db.risks, [{"$match": {**person_match("owner_key"), "status": "open"}}]
+            + count_by("$owner_key", "risks", {"$literal": None})),
+        (db.changes, [{"$match": {**person_match("decision_maker_key"), "status": ChangeStatus.OPEN.value}}]
+            + count_by("$decision_maker_key", "changes", {"$literal": None})),
+    ]
+    results = await asyncio.gather(*(collection.aggregate(pipeline).to_list(None) for collection, pipeline in pipelines))
+
+    loads = {}
+    for row in (row for rows in results for row in rows):
+        group = row["_id"]
+        if group["due"]:
+            try:
+                due = as_utc(datetime.fromisoformat(group["due"]))
+            except ValueError:
+                continue
+            if not first_week <= due < end:
+                continue
+            index = (due - first_week).days // 7
+        else:
+            index = 0
+        person_weeks = loads.setdefault(group["person"], [
+            WeekLoad(week_start=first_week + timedelta(weeks=i)) for i in range(weeks)
+        ])
+        week = person_weeks[index]
+        setattr(week, group["kind"], getattr(week, group["kind"]) + row["count"])
+
+    people = {p["key"]: p async for p in db.people.find({"key": {"$in": list(loads)}}, {"_id": 0})}
+    result = []
+    for key, person_weeks in sorted(loads.items()):
+        person = people.get(key, {})
+        capacity = person.get("capacity_per_week") or WORKLOAD_DEFAULT_CAPACITY
+        for week in person_weeks:
+            week.load = sum(getattr(week, kind) * weight for kind, weight in WORKLOAD_WEIGHTS.items())
+            week.overloaded = week.load > capacity
+        result.append(OwnerWorkload(
+            person_key=key,
+            name=person.get("name", key),
+            capacity_per_week=capacity,
+            overloaded=any(week.overloaded for week in person_weeks),
+            weeks=person_weeks,
+        ))
+    return result
+
+def tenant_admin(token: Optional[str]):
+    return bool(TENANT_ADMIN_TOKEN) and hmac.compare_digest(token or "", TENANT_ADMIN_TOKEN)
+
+@api_router.post("/tenants", response_model=TenantRegistration)
+async def register_tenant(registration: TenantRegistration, x_admin_token: Optional[str] = Header(None)):
+    if not tenant_admin(x_admin_token):
+        raise HTTPException(status_code=403, detail="Tenant registration requires the admin token")
+    tenant = registration.id.strip().lower()
+    if not TENANT_ID_PATTERN.match(tenant):
+        raise HTTPException(status_code=400, detail=f"Invalid tenant id '{registration.id}'")
+    await tenant_registry.register(tenant)
+    await ensure_tenant(tenant)
+    return TenantRegistration(id=tenant)
+
+@api_router.get("/tenants/metrics", response_model=List[TenantMetrics])
+async def get_tenant_metrics(x_admin_token: Optional[str] = Header(None)):
+    """Request counters since the server started: of the own tenant, or of all
+    tenants with the admin token"""
+    if tenant_admin(x_admin_token):
+        metrics = tenant_gate.metrics
+    else:
+        tenant = current_tenant.get()
+        metrics = {tenant: tenant_gate.stats(tenant)}
+    result = []
+    for tenant, stats in sorted(metrics.items()):
+        avg_ms = stats["total_ms"] / stats["requests"] if stats["requests"] else 0.0
+        result.append(TenantMetrics(
+            tenant=tenant,
+            max_concurrent=tenant_gate.max_concurrent,
+            avg_ms=round(avg_ms, 2),
+            **{k: v for k, v in stats.items() if k not in ("total_ms", "max_ms")},
+            max_ms=round(stats["max_ms"], 2),
+        ))
+    return result
 
 # Legacy routes for compatibility
 @api_router.get("/")
@@ -373,12 +2292,86 @@ async def root():
 # Include the router in the main app
 app.include_router(api_router)
 
+class IsolateTenant:
+    """Runs each request against the database of its tenant and holds one of
+    the tenant's concurrency slots until the response body has been sent,
+    streamed bodies included"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request = Request(scope)
+        tenant = (request.headers.get(TENANT_HEADER) or DEFAULT_TENANT).strip().lower()
+        if not TENANT_ID_PATTERN.match(tenant):
+            response = JSONResponse({"detail": f"Invalid {TENANT_HEADER}"}, status_code=400)
+        elif not await tenant_accepted(tenant):
+            response = JSONResponse({"detail": f"Unknown tenant '{tenant}'"}, status_code=403)
+        elif not await tenant_gate.acquire(tenant):
+            response = JSONResponse(
+                {"detail": "Too many concurrent requests for this tenant"},
+                status_code=503,
+                headers={"Retry-After": "1"},
+            )
+        else:
+            response = None
+        if response is not None:
+            await response(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            with use_tenant(tenant):
+                await ensure_tenant(tenant)
+                await self.app(scope, receive, send_with_status)
+        finally:
+            tenant_gate.release(tenant, (time.perf_counter() - started) * 1000, status >= 500)
+
+app.add_middleware(IsolateTenant)
+
+@app.middleware("http")
+async def compress_response(request: Request, call_next):
+    response = await call_next(request)
+    encoding = pick_encoding(request.headers.get("accept-encoding", ""))
+    # Streaming responses have no content-length and are passed through untouched
+    length = response.headers.get("content-length")
+    if (
+        encoding is None
+        or length is None
+        or int(length) < COMPRESSION_MIN_SIZE
+        or "content-encoding" in response.headers
+        or response.headers.get("content-type", "").startswith("application/pdf")
+    ):
+        return response
+
+    body = b"".join([chunk async for chunk in response.body_iterator])
+    if encoding == "br":
+        body = brotli.compress(body, quality=5)
+    else:
+        body = gzip.compress(body, compresslevel=6)
+    headers = {k: v for k, v in response.headers.items() if k.lower() != "content-length"}
+    headers["content-encoding"] = encoding
+    headers["vary"] = "Accept-Encoding"
+    return Response(body, status_code=response.status_code, headers=headers, media_type=response.media_type)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Total-Count", "Retry-After"],
 )
 
 # Configure logging
@@ -388,6 +2381,52 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+async def create_indexes():
+    await db.project_history.create_index([("project_id", ASCENDING), ("ts", ASCENDING)])
+    await db.project_checkpoints.create_index([("project_id", ASCENDING), ("ts", DESCENDING)])
+    await db.history_counters.create_index("project_id", unique=True)
+    for prefix in ["", ARCHIVE_PREFIX]:
+        await db[prefix + "projects"].create_index("id", unique=True)
+        await db[prefix + "projects"].create_index("status")
+        for name in HISTORY_COLLECTIONS[1:]:
+            await db[prefix + name].create_index("id", unique=True)
+            await db[prefix + name].create_index("project_id")
+        for name in HISTORY_COLLECTIONS:
+            # Delta sync and the consistency check page in (updated_at, id) order
+            await db[prefix + name].create_index([("updated_at", ASCENDING), ("id", ASCENDING)])
+        # Default sort orders of the table views
+        await db[prefix + "tasks"].create_index([("project_id", ASCENDING), ("pos", ASCENDING)])
+        await db[prefix + "tasks"].create_index([("project_id", ASCENDING), ("due", ASCENDING)])
+        await db[prefix + "risks"].create_index([("project_id", ASCENDING), ("score", DESCENDING)])
+        await db[prefix + "milestones"].create_index([("project_id", ASCENDING), ("task_ids", ASCENDING)])
+    await db.people.create_index("key", unique=True)
+    await db.people.create_index("aliases")
+    await db.tasks.create_index([("owner_key", ASCENDING), ("due", ASCENDING)])
+    await db.milestones.create_index([("owner_key", ASCENDING), ("plan", ASCENDING)])
+    await db.risks.create_index([("owner_key", ASCENDING), ("status", ASCENDING)])
+    await db.changes.create_index([("decision_maker_key", ASCENDING), ("status", ASCENDING)])
+    await db.project_history.create_index([("op", ASCENDING), ("ts", ASCENDING)])
+    await db.consistency_checkpoints.create_index("collection", unique=True)
+    await db.consistency_runs.create_index([("started_at", DESCENDING)])
+    await db.job_runs.create_index("job", unique=True)
+
+@app.on_event("startup")
+async def setup_tenants():
+    await tenant_database(DEFAULT_TENANT).tenants.create_index("id", unique=True)
+    for tenant in await known_tenants():
+        await ensure_tenant(tenant)
+
+@app.on_event("startup")
+async def start_background_jobs():
+    if KPI_SNAPSHOT_INTERVAL_HOURS > 0:
+        asyncio.create_task(run_periodically(KPI_SNAPSHOT_INTERVAL_HOURS, snapshot_project_kpis))
+    if ARCHIVE_INTERVAL_HOURS > 0:
+        asyncio.create_task(run_periodically(ARCHIVE_INTERVAL_HOURS, archive_closed_projects))
+    if CONSISTENCY_INTERVAL_HOURS > 0:
+        asyncio.create_task(run_periodically(CONSISTENCY_INTERVAL_HOURS, check_consistency_incrementally))
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+    client.close()
+    if report_pool is not None:
+        report_pool.shutdown(wait=False, cancel_futures=True)
\ No newline at end of file
@@ -423,6 +423,33 @@ class ProjectReportingAPITester:
             return True
         return False
 
+    def test_project_history_report(self):
+        """Test the project history and point-in-time report"""
+        if not self.created_project_id:
+            print("❌ No project ID available for history test")
+            return False
+
+        success, response = self.run_test(
+            "Get Project History",
+            "GET",
+            f"projects/{self.created_project_id}/history",
+            200
+        )
+        if success and isinstance(response, list):
+            print(f"   📊 History entries: {len(response)}")
+
+        report_success, report = self.run_test(
+            "Get Project Report (as_of now)",
+            "GET",
+            f"projects/{self.created_project_id}/report",
+            200,
+            params={"as_of": datetime.now(timezone.utc).isoformat()}
+        )
+        if report_success and report.get('project', {}).get('title') == "Updated Test Projekt":
+            print(f"   ✅ Report reflects the latest project update")
+
+        return success and report_success
+
     def test_delete_project(self):
         """Test deleting a project"""
         if not self.created_project_id:
@@ -466,6 +493,9 @@ def main():
     test_results.append(("Create Multiple Tasks", tester.test_create_multiple_tasks()))
     test_results.append(("Get Tasks for Project", tester.test_get_tasks_for_project()))
     test_results.append(("Get All Tasks", tester.test_get_all_tasks()))
+
+    # History / report tests
+    test_results.append(("Project History Report", tester.test_project_history_report()))
     
     # Cleanup
     test_results.append(("Delete Project", tester.test_delete_project()))
@@ -79,6 +79,10 @@ def create_test_projects_and_tasks():
         }
     ]
     
+    # Load the existing tasks of all projects in one batch request
+    response = requests.post(f"{API_URL}/tasks/batch", json={"project_ids": list(project_ids.values())})
+    existing_tasks_by_project = response.json()
+    
     # Create the specific tasks
     for task_data in specific_tasks:
         project_title = task_data["project"]
@@ -86,8 +90,7 @@ def create_test_projects_and_tasks():
             project_id = project_ids[project_title]
             
             # Check if task already exists
-            response = requests.get(f"{API_URL}/tasks", params={"project_id": project_id})
-            existing_tasks = response.json()
+            existing_tasks = existing_tasks_by_project.get(project_id, [])
             
             task_exists = any(t['index'] == task_data['index'] and t['task'] == task_data['task'] for t in existing_tasks)
             
@@ -1,19 +1,19 @@
 // frontend/src/App.js
 import { useEffect, useState } from "react";
 import "./App.css";
+import { loadCached, syncFromBackend, syncFromStatic } from "./lib/sync";
+import ProjectTables from "./components/ProjectTables";
 const PROJECTS_URL =
   "https://pellecchiagianluca-svg.github.io/Projektbearbeitung-und-Status-Privat-Repo/api/projects/index.json";
 // <<< HIER NUR DIESE EINE ZEILE ANPASSEN, WENN SICH DER REPO-NAME ÄNDERT >>>
-seEffect(() => {
-  fetch(PROJECTS_URL)
-    .then((res) => res.json())
-    .then((data) => setProjects(data))
-    .catch((err) => console.error("Fehler beim Laden der Projekte:", err));
-}, []);
+// Mit Backend wird per Delta-Sync geladen, sonst die statische index.json
+const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 export default function App() {
   const [projects, setProjects] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState("");
+  const [offline, setOffline] = useState(false);
+  const [selectedId, setSelectedId] = useState(null);
 
   useEffect(() => {
     let cancelled = false;
@@ -21,22 +21,30 @@ export default function App() {
     async function load() {
       setLoading(true);
       setError("");
-      try {
-        const res = await fetch(PROJECTS_URL, {
-          headers: { "Cache-Control": "no-cache" },
-        });
-        if (!res.ok) {
-          throw new Error(`HTTP ${res.status} beim Laden der Projekte`);
-        }
-        const data = await res.json();
+      setOffline(false);
 
-        if (!Array.isArray(data)) {
-          throw new Error("Unerwartetes Datenformat (keine Liste/Array).");
+      // Zwischengespeicherte Daten sofort anzeigen
+      let hasCache = false;
+      try {
+        const cached = await loadCached();
+        if (!cancelled && cached.projects.length > 0) {
+          hasCache = true;
+          setProjects(cached.projects);
+          setLoading(false);
         }
+      } catch (e) {
+        console.warn("Offline-Cache nicht verfügbar:", e);
+      }
 
-        if (!cancelled) setProjects(data);
+      try {
+        const data = BACKEND_URL
+          ? await syncFromBackend(BACKEND_URL)
+          : await syncFromStatic(PROJECTS_URL);
+        if (!cancelled) setProjects(data.projects);
       } catch (e) {
-        if (!cancelled) setError(e.message || "Unbekannter Fehler");
+        if (cancelled) return;
+        if (hasCache) setOffline(true);
+        else setError(e.message || "Unbekannter Fehler");
       } finally {
         if (!cancelled) setLoading(false);
       }
@@ -57,6 +65,12 @@ export default function App() {
 
       {loading && <div className="card">🔄 Projekte werden geladen…</div>}
 
+      {offline && (
+        <div className="card">
+          📴 Keine Verbindung – es werden zwischengespeicherte Daten angezeigt.
+        </div>
+      )}
+
       {error && (
         <div className="card error">
           ⚠️ Fehler beim Laden der Projekte: <b>{error}</b>
@@ -72,13 +86,17 @@ export default function App() {
       {!loading && !error && (
         <div className="grid">
           {projects.map((p) => (
-            <article key={p.id} className="card">
+            <article
+              key={p.id}
+              className={`card ${selectedId === p.id ? "selected" : ""}`}
+              onClick={() => BACKEND_URL && setSelectedId(p.id)}
+            >
               <h3 style={{ marginBottom: 6 }}>{p.title}</h3>
               <div>
-                <b>Kunde:</b> {p.kunde}
+                <b>Kunde:</b> {p.kunde ?? p.customer}
               </div>
               <div>
-                <b>Autor:</b> {p.autor}
+                <b>Autor:</b> {p.autor ?? p.author}
               </div>
               <div>
                 <b>Status:</b>{" "}
@@ -90,6 +108,10 @@ export default function App() {
           ))}
         </div>
       )}
+
+      {BACKEND_URL && selectedId && (
+        <ProjectTables backendUrl={BACKEND_URL} projectId={selectedId} />
+      )}
     </div>
   );
 }
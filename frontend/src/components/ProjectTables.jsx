@@ -0,0 +1,128 @@
+// frontend/src/components/ProjectTables.jsx
+// Aufgaben-, Risiko- und Budgettabellen eines Projekts (virtualisiert,
+// Sortierung/Filter/Paging übernimmt das Backend).
+import { useCallback, useEffect, useState } from "react";
+import { fetchPage } from "../lib/api";
+import { Tabs, TabsContent, TabsList, TabsTrigger } from "./ui/tabs";
+import VirtualTable from "./VirtualTable";
+
+const formatDate = (value) => (value ? new Date(value).toLocaleDateString("de-DE") : "");
+const formatEuro = (value) =>
+  typeof value === "number"
+    ? value.toLocaleString("de-DE", { style: "currency", currency: "EUR" })
+    : "";
+
+const TASK_COLUMNS = [
+  { key: "pos", label: "Pos", flex: 0.5 },
+  { key: "index", label: "Index", flex: 0.7 },
+  { key: "task", label: "Aufgabe", flex: 3 },
+  { key: "owner", label: "Verantwortlich", flex: 1.5 },
+  { key: "due", label: "Fällig", render: formatDate },
+  { key: "status", label: "Status", flex: 0.7 },
+  { key: "prog", label: "Fortschritt", flex: 0.8, render: (v) => `${v ?? 0} %` },
+  { key: "risk_level", label: "Risiko", flex: 0.7 },
+];
+
+const RISK_COLUMNS = [
+  { key: "title", label: "Titel", flex: 2.5 },
+  { key: "category", label: "Kategorie" },
+  { key: "p", label: "P", flex: 0.4 },
+  { key: "a", label: "A", flex: 0.4 },
+  { key: "score", label: "Score", flex: 0.6 },
+  { key: "owner", label: "Verantwortlich", flex: 1.5 },
+  { key: "status", label: "Status", flex: 0.7 },
+];
+
+const BUDGET_COLUMNS = [
+  { key: "item", label: "Position", flex: 2.5 },
+  { key: "plan", label: "Plan", render: formatEuro },
+  { key: "actual", label: "Ist", render: formatEuro },
+  { key: "fc", label: "Prognose", render: formatEuro },
+  { key: "delta", label: "Delta", render: formatEuro },
+  { key: "comment", label: "Kommentar", flex: 2, sortable: false },
+];
+
+// Eingaben erst nach einer kurzen Pause an den Server schicken
+function useDebounced(value, delay = 300) {
+  const [debounced, setDebounced] = useState(value);
+  useEffect(() => {
+    const timer = setTimeout(() => setDebounced(value), delay);
+    return () => clearTimeout(timer);
+  }, [value, delay]);
+  return debounced;
+}
+
+function ServerTable({ backendUrl, collection, projectId, columns, defaultSort, filters }) {
+  // filters ist ein neues Objekt pro Render, entscheidend sind die Werte
+  const filterKey = JSON.stringify(filters || {});
+  const fetcher = useCallback(
+    (params) =>
+      fetchPage(`${backendUrl.replace(/\/$/, "")}/api/${collection}`, {
+        project_id: projectId,
+        ...JSON.parse(filterKey),
+        ...params,
+      }),
+    [backendUrl, collection, projectId, filterKey]
+  );
+  return <VirtualTable columns={columns} fetchPage={fetcher} defaultSort={defaultSort} />;
+}
+
+export default function ProjectTables({ backendUrl, projectId }) {
+  const [owner, setOwner] = useState("");
+  const [status, setStatus] = useState("");
+  const ownerFilter = useDebounced(owner.trim());
+  const statusFilter = useDebounced(status.trim());
+
+  return (
+    <Tabs defaultValue="tasks" className="card">
+      <TabsList>
+        <TabsTrigger value="tasks">Aufgaben</TabsTrigger>
+        <TabsTrigger value="risks">Risiken</TabsTrigger>
+        <TabsTrigger value="budget">Budget</TabsTrigger>
+      </TabsList>
+
+      <div className="vt-filters">
+        <input
+          placeholder="Verantwortlich"
+          value={owner}
+          onChange={(e) => setOwner(e.target.value)}
+        />
+        <input
+          placeholder="Status"
+          value={status}
+          onChange={(e) => setStatus(e.target.value)}
+        />
+      </div>
+
+      <TabsContent value="tasks">
+        <ServerTable
+          backendUrl={backendUrl}
+          collection="tasks"
+          projectId={projectId}
+          columns={TASK_COLUMNS}
+          defaultSort="pos"
+          filters={{ owner: ownerFilter, status: statusFilter }}
+        />
+      </TabsContent>
+      <TabsContent value="risks">
+        <ServerTable
+          backendUrl={backendUrl}
+          collection="risks"
+          projectId={projectId}
+          columns={RISK_COLUMNS}
+          defaultSort="-score"
+          filters={{ owner: ownerFilter, status: statusFilter }}
+        />
+      </TabsContent>
+      <TabsContent value="budget">
+        <ServerTable
+          backendUrl={backendUrl}
+          collection="budget"
+          projectId={projectId}
+          columns={BUDGET_COLUMNS}
+          defaultSort="item"
+        />
+      </TabsContent>
+    </Tabs>
+  );
+}
@@ -0,0 +1,124 @@
+// frontend/src/components/VirtualTable.jsx
+// Virtualisierte Tabelle: es werden nur die sichtbaren Zeilen (+ Overscan)
+// gerendert, die Daten kommen seitenweise sortiert/gefiltert vom Server.
+import { memo, useCallback, useEffect, useRef, useState } from "react";
+
+const ROW_HEIGHT = 36;
+const OVERSCAN = 8;
+const PAGE_SIZE = 200;
+
+const Row = memo(function Row({ item, columns, top }) {
+  return (
+    <div className="vt-row" role="row" style={{ top, height: ROW_HEIGHT }}>
+      {columns.map((col) => (
+        <div key={col.key} className="vt-cell" role="cell" style={{ flex: col.flex || 1 }}>
+          {item ? (col.render ? col.render(item[col.key], item) : item[col.key]) : "…"}
+        </div>
+      ))}
+    </div>
+  );
+});
+
+// fetchPage({ skip, limit, sort, with_total }) muss per useCallback stabil sein,
+// eine neue Funktion (z. B. bei geänderten Filtern) lädt die Tabelle neu.
+export default function VirtualTable({ columns, fetchPage, height = 480, defaultSort }) {
+  const [sort, setSort] = useState(defaultSort);
+  const [total, setTotal] = useState(0);
+  const [scrollTop, setScrollTop] = useState(0);
+  const [, setLoadedPages] = useState(0);
+  const [error, setError] = useState("");
+  const pagesRef = useRef(new Map());
+  const generationRef = useRef(0);
+  const scrollRef = useRef(null);
+  const frameRef = useRef(0);
+
+  // Neue Sortierung oder neue Filter: Cache verwerfen und nach oben springen
+  useEffect(() => {
+    generationRef.current += 1;
+    pagesRef.current = new Map();
+    setTotal(0);
+    setError("");
+    setLoadedPages(0);
+    setScrollTop(0);
+    if (scrollRef.current) scrollRef.current.scrollTop = 0;
+  }, [sort, fetchPage]);
+
+  const loadPage = useCallback(
+    async (page) => {
+      if (pagesRef.current.has(page)) return;
+      const generation = generationRef.current;
+      pagesRef.current.set(page, null);
+      try {
+        const result = await fetchPage({
+          skip: page * PAGE_SIZE,
+          limit: PAGE_SIZE,
+          sort,
+          with_total: page === 0 ? "true" : undefined,
+        });
+        if (generation !== generationRef.current) return;
+        pagesRef.current.set(page, result.items);
+        if (result.total !== undefined) setTotal(result.total);
+        setLoadedPages((n) => n + 1);
+      } catch (e) {
+        if (generation !== generationRef.current) return;
+        pagesRef.current.delete(page);
+        setError(e.message || "Unbekannter Fehler");
+      }
+    },
+    [fetchPage, sort]
+  );
+
+  const visibleCount = Math.ceil(height / ROW_HEIGHT);
+  const start = Math.max(0, Math.floor(scrollTop / ROW_HEIGHT) - OVERSCAN);
+  const end = Math.min(Math.max(total, 1), start + visibleCount + 2 * OVERSCAN);
+
+  useEffect(() => {
+    for (let page = Math.floor(start / PAGE_SIZE); page <= Math.floor((end - 1) / PAGE_SIZE); page++) {
+      loadPage(page);
+    }
+  }, [start, end, loadPage]);
+
+  const onScroll = useCallback((event) => {
+    const top = event.currentTarget.scrollTop;
+    cancelAnimationFrame(frameRef.current);
+    frameRef.current = requestAnimationFrame(() => setScrollTop(top));
+  }, []);
+
+  useEffect(() => () => cancelAnimationFrame(frameRef.current), []);
+
+  const toggleSort = (key) => {
+    setSort((current) => (current === key ? `-${key}` : key));
+  };
+
+  const rows = [];
+  for (let i = start; i < Math.min(end, total); i++) {
+    const page = pagesRef.current.get(Math.floor(i / PAGE_SIZE));
+    const item = page ? page[i % PAGE_SIZE] : undefined;
+    rows.push(<Row key={i} item={item} columns={columns} top={i * ROW_HEIGHT} />);
+  }
+
+  return (
+    <div className="vt" role="table">
+      <div className="vt-header" role="row">
+        {columns.map((col) => (
+          <div
+            key={col.key}
+            className="vt-cell vt-head"
+            role="columnheader"
+            style={{ flex: col.flex || 1 }}
+            onClick={() => col.sortable !== false && toggleSort(col.key)}
+          >
+            {col.label}
+            {sort === col.key && " ▲"}
+            {sort === `-${col.key}` && " ▼"}
+          </div>
+        ))}
+      </div>
+      {error && <div className="card error">⚠️ {error}</div>}
+      <div className="vt-body" ref={scrollRef} onScroll={onScroll} style={{ height }}>
+        <div style={{ height: total * ROW_HEIGHT, position: "relative" }}>{rows}</div>
+      </div>
+      <div className="vt-footer">{total} Einträge</div>
+    </div>
+  );
+}
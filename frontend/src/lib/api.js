@@ -0,0 +1,52 @@
+// frontend/src/lib/api.js
+// Der Backend-Server kann Listen kompakt als Spalten-JSON liefern:
+// { columns: ["id", "title", ...], rows: [["…", "…"], ...] }
+// gzip/brotli entpackt der Browser selbst.
+export const COLUMNAR_MEDIA_TYPE = "application/vnd.columnar+json";
+
+export function fromColumnar(data) {
+  if (Array.isArray(data)) return data;
+  if (!data || !Array.isArray(data.columns) || !Array.isArray(data.rows)) {
+    throw new Error("Unerwartetes Datenformat (keine Liste/Array).");
+  }
+  const { columns, rows } = data;
+  return rows.map((row) => {
+    const item = {};
+    for (let i = 0; i < columns.length; i++) item[columns[i]] = row[i];
+    return item;
+  });
+}
+
+export async function fetchList(url, options = {}) {
+  const res = await fetch(url, {
+    ...options,
+    headers: {
+      Accept: `${COLUMNAR_MEDIA_TYPE}, application/json;q=0.9`,
+      ...(options.headers || {}),
+    },
+  });
+  if (!res.ok) {
+    throw new Error(`HTTP ${res.status} beim Laden von ${url}`);
+  }
+  return fromColumnar(await res.json());
+}
+
+// Eine Seite einer sortierten/gefilterten Liste; die Gesamtzahl kommt aus
+// dem X-Total-Count-Header (nur wenn with_total=true angefragt wurde).
+export async function fetchPage(url, params = {}) {
+  const target = new URL(url, window.location.href);
+  for (const [key, value] of Object.entries(params)) {
+    if (value !== undefined && value !== null && value !== "") {
+      target.searchParams.set(key, value);
+    }
+  }
+  const res = await fetch(target, {
+    headers: { Accept: `${COLUMNAR_MEDIA_TYPE}, application/json;q=0.9` },
+  });
+  if (!res.ok) {
+    throw new Error(`HTTP ${res.status} beim Laden von ${url}`);
+  }
+  const items = fromColumnar(await res.json());
+  const total = res.headers.get("X-Total-Count");
+  return { items, total: total === null ? undefined : Number(total) };
+}
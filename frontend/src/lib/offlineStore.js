@@ -0,0 +1,97 @@
+// frontend/src/lib/offlineStore.js
+// Kleiner IndexedDB-Wrapper: ein Object Store pro Backend-Collection
+// (Schlüssel "id", Kinder zusätzlich mit Index "project_id") und ein
+// "meta"-Store für den Sync-Watermark.
+const DB_NAME = "projekt-reporting";
+const DB_VERSION = 1;
+
+export const CHILD_STORES = ["milestones", "budget", "risks", "tasks", "changes"];
+export const DATA_STORES = ["projects", ...CHILD_STORES];
+
+let dbPromise = null;
+
+function promisify(request) {
+  return new Promise((resolve, reject) => {
+    request.onsuccess = () => resolve(request.result);
+    request.onerror = () => reject(request.error);
+  });
+}
+
+function done(tx) {
+  return new Promise((resolve, reject) => {
+    tx.oncomplete = () => resolve();
+    tx.onerror = () => reject(tx.error);
+    tx.onabort = () => reject(tx.error);
+  });
+}
+
+export function openDb() {
+  if (!dbPromise) {
+    if (typeof indexedDB === "undefined") {
+      return Promise.reject(new Error("IndexedDB nicht verfügbar"));
+    }
+    const request = indexedDB.open(DB_NAME, DB_VERSION);
+    request.onupgradeneeded = () => {
+      const db = request.result;
+      db.createObjectStore("projects", { keyPath: "id" });
+      for (const name of CHILD_STORES) {
+        const store = db.createObjectStore(name, { keyPath: "id" });
+        store.createIndex("project_id", "project_id");
+      }
+      db.createObjectStore("meta", { keyPath: "key" });
+    };
+    dbPromise = promisify(request).catch((e) => {
+      dbPromise = null;
+      throw e;
+    });
+  }
+  return dbPromise;
+}
+
+export async function getAll(storeName) {
+  const db = await openDb();
+  return promisify(db.transaction(storeName).objectStore(storeName).getAll());
+}
+
+export async function getMeta(key) {
+  const db = await openDb();
+  const entry = await promisify(db.transaction("meta").objectStore("meta").get(key));
+  return entry ? entry.value : undefined;
+}
+
+export async function setMeta(key, value) {
+  const db = await openDb();
+  const tx = db.transaction("meta", "readwrite");
+  tx.objectStore("meta").put({ key, value });
+  return done(tx);
+}
+
+// Wendet eine Änderung in einer einzigen Transaktion an:
+// { clear: bool, put: {store: [items]}, remove: {store: [ids]}, removeProjects: [ids] }
+export async function applyChanges({ clear = false, put = {}, remove = {}, removeProjects = [] }) {
+  const db = await openDb();
+  const tx = db.transaction(DATA_STORES, "readwrite");
+
+  for (const name of DATA_STORES) {
+    const store = tx.objectStore(name);
+    if (clear) store.clear();
+    for (const id of remove[name] || []) store.delete(id);
+    for (const item of put[name] || []) store.put(item);
+  }
+
+  for (const projectId of removeProjects) {
+    tx.objectStore("projects").delete(projectId);
+    for (const name of CHILD_STORES) {
+      const index = tx.objectStore(name).index("project_id");
+      index.openKeyCursor(IDBKeyRange.only(projectId)).onsuccess = (event) => {
+        const cursor = event.target.result;
+        if (cursor) {
+          tx.objectStore(name).delete(cursor.primaryKey);
+          cursor.continue();
+        }
+      };
+    }
+  }
+
+  return done(tx);
+}
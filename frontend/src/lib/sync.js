@@ -0,0 +1,54 @@
+// frontend/src/lib/sync.js
+// Offline-first Datenschicht: zuerst den IndexedDB-Cache anzeigen, danach nur
+// die Änderungen seit dem letzten Watermark vom Backend holen (/api/sync).
+import { fetchList } from "./api";
+import { DATA_STORES, applyChanges, getAll, getMeta, setMeta } from "./offlineStore";
+
+const WATERMARK_KEY = "watermark";
+
+export async function loadCached() {
+  const entries = await Promise.all(DATA_STORES.map((name) => getAll(name)));
+  return Object.fromEntries(DATA_STORES.map((name, i) => [name, entries[i]]));
+}
+
+// Delta-Sync gegen das FastAPI-Backend, seitenweise über den Cursor. Der
+// Watermark wird erst nach der letzten Seite gespeichert, ein abgebrochener
+// Sync beginnt beim nächsten Mal wieder von vorn.
+export async function syncFromBackend(backendUrl) {
+  const watermark = await getMeta(WATERMARK_KEY);
+  const base = new URL(`${backendUrl.replace(/\/$/, "")}/api/sync`, window.location.href);
+  let cursor = null;
+  let data;
+
+  do {
+    const url = new URL(base);
+    if (cursor) url.searchParams.set("cursor", cursor);
+    else if (watermark) url.searchParams.set("updated_since", watermark);
+
+    const res = await fetch(url);
+    if (!res.ok) {
+      throw new Error(`HTTP ${res.status} beim Synchronisieren`);
+    }
+    data = await res.json();
+
+    const put = Object.fromEntries(DATA_STORES.map((name) => [name, data[name] || []]));
+    const deleted = data.deleted || {};
+    // Gelöschte und archivierte Projekte nehmen ihre Kinder mit
+    const removeProjects = [...(deleted.projects || []), ...(data.removed_projects || [])];
+
+    await applyChanges({ clear: data.full, put, remove: deleted, removeProjects });
+    cursor = data.cursor;
+  } while (data.has_more);
+
+  await setMeta(WATERMARK_KEY, data.watermark);
+  return loadCached();
+}
+
+// Ohne Backend (GitHub Pages) gibt es nur die statische Projektliste
+export async function syncFromStatic(projectsUrl) {
+  const projects = await fetchList(projectsUrl, {
+    headers: { "Cache-Control": "no-cache" },
+  });
+  await applyChanges({ clear: true, put: { projects } });
+  return loadCached();
+}
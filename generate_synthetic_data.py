@@ -0,0 +1,427 @@
+"""Deterministic synthetic data for capacity tests.
+
+Writes projects with milestones, budget lines, risks, tasks, change requests
+and the people registry straight into MongoDB, in the same document layout the
+backend stores. Every project is generated from its own seeded RNG, so the same
+--seed always produces the same data, no matter how many workers are used.
+
+    python generate_synthetic_data.py --projects 10000 --tasks 200 --workers 8 --drop
+
+MONGO_URL and DB_NAME are read from the environment or backend/.env.
+"""
+import argparse
+import math
+import os
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from multiprocessing import Pool
+from pathlib import Path
+
+from dotenv import load_dotenv
+from pymongo import MongoClient, UpdateOne
+from pymongo.errors import BulkWriteError
+
+COLLECTIONS = ["projects", "milestones", "budget", "risks", "tasks", "changes"]
+# State the backend derives from the collections above, stale without them
+DERIVED_COLLECTIONS = [
+    "project_history", "history_counters", "project_checkpoints", "consistency_checkpoints",
+    "consistency_runs", "project_kpis", "job_runs",
+] + ["archive_" + name for name in COLLECTIONS]
+DUPLICATE_KEY = 11000
+
+FIRST_NAMES = ["Anna", "Ben", "Clara", "David", "Eva", "Felix", "Greta", "Hannah", "Jonas", "Katrin",
+               "Lukas", "Marie", "Nils", "Olga", "Paul", "Sophie", "Tim", "Ulla", "Veronika", "Yusuf"]
+LAST_NAMES = ["Müller", "Schmidt", "Schneider", "Fischer", "Weber", "Meyer", "Wagner", "Becker",
+              "Schulz", "Hoffmann", "Koch", "Richter", "Klein", "Wolf", "Neumann", "Schwarz"]
+CITIES = ["Berlin", "Hamburg", "München", "Köln", "Frankfurt", "Stuttgart", "Düsseldorf", "Leipzig",
+          "Dortmund", "Bremen", "Dresden", "Hannover", "Nürnberg"]
+CUSTOMERS = ["GmbH", "AG", "KG", "Holding", "Solutions", "Logistik", "Energie", "Bau"]
+PROJECT_KINDS = ["ERP Migration", "Webshop", "Mobile App", "Rechenzentrum", "Netzwerk", "CRM Einführung",
+                 "Werkserweiterung", "Datenplattform", "Lagerautomatisierung", "Portal Relaunch"]
+TASK_VERBS = ["Konzept", "Umsetzung", "Test", "Abnahme", "Schulung", "Rollout", "Dokumentation", "Migration"]
+TASK_OBJECTS = ["Schnittstellen", "Datenmodell", "Frontend", "Backend", "Infrastruktur", "Berechtigungen",
+                "Reporting", "Altdaten", "Hardware", "Prozesse"]
+BUDGET_ITEMS = ["Personal", "Lizenzen", "Hardware", "Beratung", "Reisekosten", "Schulung", "Betrieb",
+                "Material", "Subunternehmer", "Reserve", "Infrastruktur", "Wartung"]
+RISK_TITLES = ["Lieferverzug", "Ressourcenengpass", "Scope Creep", "Technische Schulden", "Datenqualität",
+               "Abhängigkeit Drittanbieter", "Akzeptanz Anwender", "Budgetkürzung", "Sicherheitslücke",
+               "Regulatorische Änderung", "Schlüsselperson fällt aus", "Förderung"]
+CHANGE_TYPES = ["change_request", "kundenwunsch", "reklamation", "optimierung", "zusatzleistung"]
+
+# Weighted distributions: (values, weights)
+PROJECT_STATUS = (["planning", "active", "on_hold", "completed", "cancelled"], [15, 55, 8, 17, 5])
+RISK_P = ([1, 2, 3, 4, 5], [15, 30, 30, 17, 8])
+RISK_A = ([1, 2, 3, 4, 5], [20, 30, 25, 15, 10])
+TASK_RISK = (["low", "mid", "high"], [65, 25, 10])
+CHANGE_PRIORITY = (["niedrig", "mittel", "hoch", "kritisch"], [25, 45, 22, 8])
+CHANGE_STATUS = (["open", "approved", "rejected", "implemented"], [30, 25, 10, 35])
+
+# Mean of the log-normal task count is --tasks, this is its spread
+TASK_COUNT_SIGMA = 0.6
+
+
+def person_key(name):
+    # Same normalisation as the backend's people registry
+    return " ".join(name.split()).casefold()
+
+
+def iso(value):
+    return value.isoformat()
+
+
+def new_id(rng):
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def pick(rng, distribution):
+    values, weights = distribution
+    return rng.choices(values, weights)[0]
+
+
+class Owners:
+    """People pool where a few people own most items (Zipf-like)"""
+
+    def __init__(self, names):
+        self.names = names
+        weights = [1 / (rank + 1) ** 0.8 for rank in range(len(names))]
+        total = 0.0
+        self.cum_weights = []
+        for weight in weights:
+            total += weight
+            self.cum_weights.append(total)
+
+    def pick(self, rng):
+        return rng.choices(self.names, cum_weights=self.cum_weights)[0]
+
+
+def people_names(count):
+    names = []
+    for i in range(count):
+        first = FIRST_NAMES[i % len(FIRST_NAMES)]
+        last = LAST_NAMES[(i // len(FIRST_NAMES)) % len(LAST_NAMES)]
+        suffix = i // (len(FIRST_NAMES) * len(LAST_NAMES))
+        names.append(f"{first} {last}" + (f" {suffix + 1}" if suffix else ""))
+    return names
+
+
+def generate_project(seed, index, options, owners):
+    """All documents of one project as {collection: [docs]}"""
+    rng = random.Random(f"{seed}:{index}")
+    today = options["today"]
+    docs = {name: [] for name in COLLECTIONS}
+
+    # Health drives lamps, slips, overruns and task status together
+    health = rng.betavariate(5, 2)
+    status = pick(rng, PROJECT_STATUS)
+    duration = rng.randint(90, 720)
+    if status in ("completed", "cancelled"):
+        start = today - timedelta(days=duration + rng.randint(0, 365))
+    elif status == "planning":
+        start = today + timedelta(days=rng.randint(0, 90))
+    else:
+        start = today - timedelta(days=rng.randint(0, duration))
+    elapsed = min(max((today - start).days / duration, 0.0), 1.0)
+
+    def touched(earliest):
+        # updated_at: some time between the document's start and today
+        earliest = min(earliest, today)
+        return iso(earliest + timedelta(seconds=rng.randint(0, max(int((today - earliest).total_seconds()), 0))))
+
+    def lamp():
+        value = health + rng.gauss(0, 0.15)
+        return "red" if value < 0.35 else "yellow" if value < 0.6 else "green"
+
+    project_id = new_id(rng)
+    author = owners.pick(rng)
+    docs["projects"].append({
+        "id": project_id,
+        "title": f"{rng.choice(PROJECT_KINDS)} {index + 1}",
+        "customer": f"{rng.choice(LAST_NAMES)} {rng.choice(CUSTOMERS)}",
+        "location": rng.choice(CITIES),
+        "version": f"1.{rng.randint(0, 9)}",
+        "date": iso(start),
+        "author": author,
+        "status": status,
+        "lamps": {key: lamp() for key in ["scope", "time", "cost", "risk", "quality"]},
+        "updated_at": touched(start),
+    })
+
+    # Milestones: evenly spaced gates, later gates slip more on unhealthy projects
+    gates = rng.randint(4, 8)
+    for g in range(gates):
+        plan = start + timedelta(days=round(duration * (g + 1) / gates))
+        roll = rng.random()
+        if roll < (1 - health) * 0.9:
+            slip = int(rng.expovariate(1 / (7 + 7 * g))) + 1
+        elif roll > 0.92:
+            slip = -rng.randint(1, 7)
+        else:
+            slip = 0
+        fc = plan + timedelta(days=slip)
+        previous = start + timedelta(days=round(duration * g / gates))
+        if fc < today:
+            ms_status = "completed" if rng.random() < 0.85 else "delayed"
+        elif plan < today:
+            ms_status = "delayed"
+        elif previous < today:
+            ms_status = "in_progress"
+        else:
+            ms_status = "planned"
+        owner = owners.pick(rng)
+        docs["milestones"].append({
+            "id": new_id(rng),
+            "project_id": project_id,
+            "gate": f"G{g + 1}",
+            "plan": iso(plan),
+            "fc": iso(fc),
+            "delta": slip,
+            "status": ms_status,
+            "owner": owner,
+            "owner_key": person_key(owner),
+            "task_ids": [],
+            "updated_at": touched(start),
+        })
+
+    # Budget: most lines on plan, a third overrun, a few overrun badly; the
+    # roll is stretched on unhealthy projects so they overrun more often
+    for item in rng.sample(BUDGET_ITEMS, rng.randint(4, 10)):
+        plan = round(rng.lognormvariate(10.5, 1.0), -2) or 100.0
+        roll = rng.random() * (0.7 + 0.6 * (1 - health))
+        if roll < 0.6:
+            overrun = rng.uniform(-0.05, 0.05)
+        elif roll < 0.9:
+            overrun = rng.uniform(0.05, 0.3)
+        else:
+            overrun = rng.uniform(0.3, 1.0)
+        fc = round(plan * (1 + overrun), 2)
+        docs["budget"].append({
+            "id": new_id(rng),
+            "project_id": project_id,
+            "item": item,
+            "plan": plan,
+            "actual": round(fc * elapsed * rng.uniform(0.8, 1.0), 2),
+            "fc": fc,
+            "delta": round(fc - plan, 2),
+            "comment": "Nachtrag beauftragt" if overrun > 0.3 else None,
+            "updated_at": touched(start),
+        })
+
+    for _ in range(max(0, round(rng.gauss(8, 4)))):
+        p, a = pick(rng, RISK_P), pick(rng, RISK_A)
+        owner = owners.pick(rng)
+        docs["risks"].append({
+            "id": new_id(rng),
+            "project_id": project_id,
+            "title": rng.choice(RISK_TITLES),
+            "category": "chance" if rng.random() < 0.15 else "risk",
+            "cea": "Ursache, Wirkung und Maßnahme siehe Risikoworkshop",
+            "p": p,
+            "a": a,
+            "score": p * a,
+            "probability": "sehr wahrscheinlich" if p >= 4 else "unwahrscheinlich",
+            "trigger": "Statusbericht",
+            "resp": "Mitigieren" if p * a >= 9 else "Beobachten",
+            "owner": owner,
+            "owner_key": person_key(owner),
+            "status": "open" if rng.random() < 0.65 else "closed",
+            "updated_at": touched(start),
+        })
+
+    # Tasks: log-normal count per project, a third depends on a recent task
+    mean = options["tasks"]
+    count = max(1, round(rng.lognormvariate(math.log(mean) - TASK_COUNT_SIGMA ** 2 / 2, TASK_COUNT_SIGMA)))
+    task_ids = []
+    task_status = (["up", "right", "down"], [health * 60, 30, (1 - health) * 60])
+    for i in range(count):
+        task_start = start + timedelta(days=rng.randint(0, duration))
+        due = task_start + timedelta(days=rng.randint(1, 60))
+        if due < today:
+            prog = 100 if rng.random() < 0.6 + 0.35 * health else rng.randint(50, 95)
+        elif task_start < today:
+            prog = rng.randint(0, 90)
+        else:
+            prog = 0
+        task_id = new_id(rng)
+        predecessors = [rng.choice(task_ids[-10:])] if task_ids and rng.random() < 0.3 else []
+        owner = owners.pick(rng)
+        docs["tasks"].append({
+            "id": task_id,
+            "project_id": project_id,
+            "pos": i + 1,
+            "index": f"{chr(65 + (i // 100) % 26)}.{i % 100 + 1}",
+            "date": iso(task_start),
+            "task": f"{rng.choice(TASK_VERBS)} {rng.choice(TASK_OBJECTS)}",
+            "owner": owner,
+            "owner_key": person_key(owner),
+            "due": iso(due),
+            "status": pick(rng, task_status),
+            "prog": prog,
+            "risk_level": pick(rng, TASK_RISK),
+            "risk_desc": None,
+            "note": None,
+            "predecessors": predecessors,
+            "fc_start": None,
+            "fc_due": None,
+            "updated_at": touched(task_start),
+        })
+        task_ids.append(task_id)
+
+    for c in range(rng.randint(0, 6)):
+        requester, decision_maker = owners.pick(rng), owners.pick(rng)
+        change_status = pick(rng, CHANGE_STATUS)
+        docs["changes"].append({
+            "id": new_id(rng),
+            "project_id": project_id,
+            "index": f"CR-{c + 1:03d}",
+            "type": rng.choice(CHANGE_TYPES),
+            "title": f"Änderung {rng.choice(TASK_OBJECTS)}",
+            "description": "Synthetische Änderungsanfrage",
+            "impact": {
+                "time_days": rng.randint(0, 30),
+                "cost_eur": round(rng.lognormvariate(8.5, 1.0), -1),
+                "scope": "",
+            },
+            "priority": pick(rng, CHANGE_PRIORITY),
+            "status": change_status,
+            "cost_coverage": rng.choice(["ja", "nein", "teilweise"]),
+            "approved": {"approved": "ja", "implemented": "ja", "rejected": "nein"}.get(change_status, "in_pruefung"),
+            "requester": requester,
+            "requester_key": person_key(requester),
+            "decision_maker": decision_maker,
+            "decision_maker_key": person_key(decision_maker),
+            "planned_implementation": None,
+            "notes": None,
+            "updated_at": touched(start),
+        })
+    return docs
+
+
+# Worker processes: one Mongo connection each
+worker_db = None
+worker_owners = None
+
+
+def init_worker(mongo_url, db_name, names):
+    global worker_db, worker_owners
+    worker_db = MongoClient(mongo_url)[db_name] if mongo_url else None
+    worker_owners = Owners(names)
+
+
+def generate_chunk(job):
+    """Generate and insert projects [first, last), returns documents per collection"""
+    seed, first, last, options = job
+    buffers = {name: [] for name in COLLECTIONS}
+    counts = {name: 0 for name in COLLECTIONS}
+
+    def flush(name):
+        if buffers[name]:
+            inserted = len(buffers[name])
+            if worker_db is not None:
+                try:
+                    worker_db[name].insert_many(buffers[name], ordered=False)
+                except BulkWriteError as e:
+                    # A rerun with the same seed finds its documents already there
+                    if any(error["code"] != DUPLICATE_KEY for error in e.details["writeErrors"]):
+                        raise
+                    inserted = e.details["nInserted"]
+            counts[name] += inserted
+            buffers[name] = []
+
+    for index in range(first, last):
+        for name, docs in generate_project(seed, index, options, worker_owners).items():
+            buffers[name].extend(docs)
+            if len(buffers[name]) >= options["batch_size"]:
+                flush(name)
+    for name in COLLECTIONS:
+        flush(name)
+    return counts
+
+
+def main():
+    load_dotenv(Path(__file__).parent / "backend" / ".env")
+    parser = argparse.ArgumentParser(description="Generate deterministic synthetic project data")
+    parser.add_argument("--projects", type=int, default=1000)
+    parser.add_argument("--tasks", type=int, default=200, help="mean number of tasks per project")
+    parser.add_argument("--people", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--today", default="2026-06-01", help="reference date of the generated schedules")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4)
+    parser.add_argument("--chunk", type=int, default=20, help="projects per worker job")
+    parser.add_argument("--batch-size", type=int, default=5000, help="documents per insert_many")
+    parser.add_argument("--mongo-url", default=os.environ.get("MONGO_URL"))
+    parser.add_argument("--db", default=os.environ.get("DB_NAME"))
+    parser.add_argument("--tenant", help="write into the database of this tenant")
+    parser.add_argument("--drop", action="store_true", help="drop the collections first")
+    parser.add_argument("--dry-run", action="store_true", help="only generate, measures the generator alone")
+    args = parser.parse_args()
+
+    mongo_url = None if args.dry_run else args.mongo_url
+    if not args.dry_run and not (mongo_url and args.db):
+        parser.error("MONGO_URL and DB_NAME (or --mongo-url and --db) are required")
+    db_name = f"{args.db}__{args.tenant}" if args.tenant and args.tenant != "default" else args.db
+    today = datetime.fromisoformat(args.today).replace(tzinfo=timezone.utc)
+    options = {"today": today, "tasks": args.tasks, "batch_size": args.batch_size}
+
+    names = people_names(args.people)
+    if mongo_url:
+        db = MongoClient(mongo_url)[db_name]
+        if args.drop:
+            for name in COLLECTIONS + DERIVED_COLLECTIONS + ["people"]:
+                db[name].drop()
+            print(f"🗑️  Dropped collections in {db_name}")
+        # Reruns rely on the unique ids to skip what is already there. The
+        # backend creates these too, but only once per process and tenant.
+        for name in COLLECTIONS:
+            db[name].create_index("id", unique=True)
+            if name != "projects":
+                db[name].create_index("project_id")
+        db.people.create_index("key", unique=True)
+        rng = random.Random(f"{args.seed}:people")
+        # Upserts keep people registered by the backend or an earlier run
+        db.people.bulk_write([
+            UpdateOne({"key": person_key(name)}, {"$setOnInsert": {
+                "id": new_id(rng), "key": person_key(name), "name": name, "email": None, "aliases": [],
+                "capacity_per_week": rng.choice([None, 8.0, 10.0, 12.0]),
+            }}, upsert=True)
+            for name in names
+        ], ordered=False)
+
+    print(f"🚀 Generating {args.projects} projects (~{args.tasks} tasks each) with seed {args.seed} "
+          f"into {db_name if mongo_url else 'nowhere (dry run)'} using {args.workers} workers")
+    jobs = [
+        (args.seed, first, min(first + args.chunk, args.projects), options)
+        for first in range(0, args.projects, args.chunk)
+    ]
+    totals = {name: 0 for name in COLLECTIONS}
+    started = time.perf_counter()
+    last_report = started
+    with Pool(args.workers, initializer=init_worker, initargs=(mongo_url, db_name, names)) as pool:
+        for done, counts in enumerate(pool.imap_unordered(generate_chunk, jobs), 1):
+            for name, count in counts.items():
+                totals[name] += count
+            now = time.perf_counter()
+            if now - last_report >= 2 or done == len(jobs):
+                last_report = now
+                docs = sum(totals.values())
+                print(f"   {totals['projects']:>8,} projects  {docs:>12,} documents  "
+                      f"{docs / (now - started):>10,.0f} docs/s")
+
+    if mongo_url:
+        # Generated updated_at values lie before --today, an incremental check
+        # would resume behind them and never look at the new documents
+        MongoClient(mongo_url)[db_name].consistency_checkpoints.delete_many({})
+
+    elapsed = time.perf_counter() - started
+    docs = sum(totals.values())
+    print("\n📊 Inserted:")
+    for name in COLLECTIONS:
+        print(f"   {name:<11}{totals[name]:>12,}")
+    print(f"   {'total':<11}{docs:>12,} in {elapsed:.1f}s = {docs / elapsed:,.0f} docs/s")
+    print("✅ Done. The backend creates missing indexes on its next start, restart a running one "
+          "so that it does not serve cached schedules and forecasts.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# The backend modules import each other as top-level modules (uvicorn server:app)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+
+@pytest.fixture
+def server(monkeypatch, tmp_path):
+    """The backend module on an in-memory MongoDB, background jobs disabled"""
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+    os.environ.setdefault("DB_NAME", "test_database")
+    import server
+
+    monkeypatch.setattr(server, "client", mongomock_motor.AsyncMongoMockClient())
+    monkeypatch.setattr(server, "tenant_databases", {})
+    monkeypatch.setattr(server, "ready_tenants", set())
+    monkeypatch.setattr(server, "schedule_graphs", server.ResultCache())
+    monkeypatch.setattr(server, "tenant_registry", server.TenantRegistry(0))
+    monkeypatch.setattr(server, "REPORT_CACHE_DIR", tmp_path / "report_cache")
+    for name in ["KPI_SNAPSHOT_INTERVAL_HOURS", "ARCHIVE_INTERVAL_HOURS", "CONSISTENCY_INTERVAL_HOURS"]:
+        monkeypatch.setattr(server, name, 0)
+
+    async def no_timeseries():
+        pass  # mongomock has no time-series collections
+
+    monkeypatch.setattr(server, "setup_kpi_collection", no_timeseries)
+    return server
+
+
+@pytest.fixture
+def api(server):
+    from fastapi.testclient import TestClient
+
+    with TestClient(server.app) as client:
+        yield client
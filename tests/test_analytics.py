@@ -0,0 +1,75 @@
+import random
+import time
+
+import numpy as np
+
+import analytics
+from analytics import build_portfolio, simulate
+
+
+def make_portfolio(n_projects, items=8, seed=1):
+    rng = random.Random(seed)
+    project_ids = [f"p{i:04d}" for i in range(n_projects)]
+    risks, budget, milestones = [], [], []
+    for project_id in project_ids:
+        for _ in range(items):
+            risks.append({"project_id": project_id, "p": rng.randint(1, 5), "a": rng.randint(1, 5),
+                          "category": "risk", "status": "open"})
+            plan = rng.uniform(1e4, 1e5)
+            budget.append({"project_id": project_id, "plan": plan, "actual": plan * 0.3,
+                           "fc": plan * rng.uniform(0.9, 1.3)})
+        milestones.append({"project_id": project_id, "delta": rng.randint(0, 20)})
+    return build_portfolio(project_ids, risks, budget, milestones)
+
+
+def test_simulate_is_reproducible_with_seed():
+    portfolio = make_portfolio(3)
+    assert simulate(portfolio, 5000, seed=7) == simulate(portfolio, 5000, seed=7)
+
+
+def test_simulate_without_risks_stays_within_budget_bounds():
+    portfolio = build_portfolio(
+        ["a"], [], [{"project_id": "a", "plan": 100.0, "actual": 0.0, "fc": 100.0}], []
+    )
+    result = simulate(portfolio, 20000, seed=1)["projects"][0]
+    assert 95.0 <= result["cost_p50"] <= result["cost_p80"] <= 115.0
+    assert result["expected_exposure"] == 0.0
+    assert result["slip_days_p80"] == 0.0
+
+
+def test_blocked_simulation_matches_single_block(monkeypatch):
+    portfolio = make_portfolio(12)
+    whole = simulate(portfolio, 20000, seed=3)
+    # Force one project per block and tiny iteration chunks
+    monkeypatch.setattr(analytics, "MAX_CELLS", 20000)
+    monkeypatch.setattr(analytics, "CHUNK_CELLS", 256)
+    blocked = simulate(portfolio, 20000, seed=3)
+    for a, b in zip(whole["projects"], blocked["projects"]):
+        assert np.isclose(a["cost_p50"], b["cost_p50"], rtol=0.01)
+        assert np.isclose(a["slip_days_p80"], b["slip_days_p80"], rtol=0.05, atol=0.5)
+    assert np.isclose(whole["cost_p80"], blocked["cost_p80"], rtol=0.01)
+
+
+def test_default_forecast_page_stays_interactive(server):
+    # A smoke check, not a benchmark: the margin keeps slow CI machines green
+    portfolio = make_portfolio(server.FORECAST_PAGE_SIZE, items=17)
+    simulate(portfolio, 1000, seed=1)  # warm up
+    started = time.perf_counter()
+    simulate(portfolio, 100000, seed=1)
+    assert time.perf_counter() - started < 5.0
+
+
+def test_forecast_pages_shrink_with_iterations(server, api):
+    for i in range(4):
+        api.portal.call(server.db.projects.insert_one, {
+            "id": f"p{i}", "title": "Projekt", "customer": "Kunde", "location": "Berlin", "author": "Autor",
+            "version": "1.0", "date": "2024-01-01T00:00:00+00:00", "status": "active",
+            "updated_at": "2024-01-01T00:00:00+00:00",
+        })
+    response = api.get("/api/analytics/forecast", params={"iterations": 1000})
+    assert response.headers["x-total-count"] == "4"
+    assert len(response.json()["projects"]) == 4
+
+    iterations = server.FORECAST_MAX_PROJECT_ITERATIONS // 2
+    response = api.get("/api/analytics/forecast", params={"iterations": iterations, "limit": 4})
+    assert [p["project_id"] for p in response.json()["projects"]] == ["p0", "p1"]
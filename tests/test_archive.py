@@ -0,0 +1,19 @@
+PROJECT = {"title": "Projekt", "customer": "Kunde", "location": "Berlin", "author": "Autor"}
+
+
+def test_restored_project_stays_until_closed_again(server, api):
+    project = api.post("/api/projects", json={**PROJECT, "status": "completed"}).json()
+    assert api.post("/api/archive/run").json()["project_ids"] == [project["id"]]
+
+    restored = api.post(f"/api/projects/{project['id']}/restore")
+    assert restored.status_code == 200
+    assert restored.json()["status"] == "completed"
+    assert api.post("/api/archive/run").json()["project_ids"] == []
+
+    # Edits keep the marker as long as the status stays
+    api.put(f"/api/projects/{project['id']}", json={**PROJECT, "title": "Neu", "status": "completed"})
+    assert api.post("/api/archive/run").json()["project_ids"] == []
+
+    api.put(f"/api/projects/{project['id']}", json={**PROJECT, "status": "active"})
+    api.put(f"/api/projects/{project['id']}", json={**PROJECT, "status": "cancelled"})
+    assert api.post("/api/archive/run").json()["project_ids"] == [project["id"]]
@@ -0,0 +1,62 @@
+import json
+
+PROJECT = {"title": "Projekt", "customer": "Kunde", "location": "Berlin", "author": "Autor"}
+
+
+def post_risk(api, project_id, title):
+    response = api.post("/api/risks", json={
+        "project_id": project_id, "title": title, "cea": "Ursache", "p": 3, "a": 2,
+        "trigger": "Verzug", "resp": "Puffer", "owner": "Autor",
+    })
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_batch_groups_by_project(server, api):
+    p1 = api.post("/api/projects", json=PROJECT).json()["id"]
+    p2 = api.post("/api/projects", json=PROJECT).json()["id"]
+    p3 = api.post("/api/projects", json=PROJECT).json()["id"]
+    post_risk(api, p1, "A")
+    post_risk(api, p1, "B")
+    post_risk(api, p2, "C")
+    post_risk(api, p3, "D")
+
+    response = api.post("/api/risks/batch", json={"project_ids": [p1, p2, "unknown"]})
+    assert response.status_code == 200
+    grouped = response.json()
+    assert set(grouped) == {p1, p2, "unknown"}
+    assert sorted(r["title"] for r in grouped[p1]) == ["A", "B"]
+    assert [r["title"] for r in grouped[p2]] == ["C"]
+    assert grouped["unknown"] == []
+
+
+def test_batch_reads_through_to_the_archive(server, api):
+    closed = api.post("/api/projects", json={**PROJECT, "status": "completed"}).json()["id"]
+    live = api.post("/api/projects", json=PROJECT).json()["id"]
+    post_risk(api, closed, "Alt")
+    post_risk(api, live, "Neu")
+    assert api.post("/api/archive/run").json()["project_ids"] == [closed]
+
+    batch = {"project_ids": [closed, live]}
+    assert api.post("/api/risks/batch", json=batch).json()[closed] == []
+    grouped = api.post("/api/risks/batch", json={**batch, "include_archived": True}).json()
+    assert [r["title"] for r in grouped[closed]] == ["Alt"]
+    assert [r["title"] for r in grouped[live]] == ["Neu"]
+
+
+def test_batch_streams_ndjson(server, api):
+    p1 = api.post("/api/projects", json=PROJECT).json()["id"]
+    p2 = api.post("/api/projects", json=PROJECT).json()["id"]
+    post_risk(api, p1, "A")
+    post_risk(api, p2, "B")
+    post_risk(api, p1, "C")
+
+    response = api.post(
+        "/api/risks/batch", json={"project_ids": [p1, p2, "unknown"]}, headers={"Accept": "application/x-ndjson"}
+    )
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    # One line per project with documents, unknown ids are left out
+    grouped = {line["project_id"]: sorted(r["title"] for r in line["items"]) for line in lines}
+    assert grouped == {p1: ["A", "C"], p2: ["B"]}
+    assert len(lines) == 2
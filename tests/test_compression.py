@@ -0,0 +1,47 @@
+PROJECT = {"title": "Projekt", "customer": "Kunde", "location": "Berlin", "author": "Autor"}
+
+
+def post_risks(api, project_id, count):
+    for i in range(count):
+        response = api.post("/api/risks", json={
+            "project_id": project_id, "title": f"Risiko {i}", "cea": "Ursache", "p": 3, "a": 2,
+            "trigger": "Verzug", "resp": "Puffer", "owner": "Autor",
+        })
+        assert response.status_code == 200, response.text
+
+
+def test_large_responses_are_compressed(server, api, monkeypatch):
+    monkeypatch.setattr(server, "COMPRESSION_MIN_SIZE", 2000)
+    project = api.post("/api/projects", json=PROJECT).json()
+    post_risks(api, project["id"], 10)
+
+    small = api.get(f"/api/projects/{project['id']}", headers={"Accept-Encoding": "gzip"})
+    assert int(small.headers["content-length"]) < 2000
+    assert "content-encoding" not in small.headers
+
+    plain = api.get("/api/risks", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert len(plain.content) >= 2000
+
+    for encoding in ["gzip", "br"]:
+        response = api.get("/api/risks", headers={"Accept-Encoding": encoding})
+        assert response.headers["content-encoding"] == encoding
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert int(response.headers["content-length"]) < len(plain.content)
+        assert response.json() == plain.json()
+
+
+def test_columnar_layout_round_trip(server, api):
+    project = api.post("/api/projects", json=PROJECT).json()
+    post_risks(api, project["id"], 3)
+
+    rows = api.get("/api/risks", params={"sort": "title"}).json()
+    response = api.get("/api/risks", params={"sort": "title"}, headers={"Accept": server.COLUMNAR_MEDIA_TYPE})
+    assert response.headers["content-type"].startswith(server.COLUMNAR_MEDIA_TYPE)
+    table = response.json()
+    assert [dict(zip(table["columns"], row)) for row in table["rows"]] == rows
+
+
+def test_columnar_keeps_keys_missing_in_the_first_row(server):
+    table = server.to_columnar([{"id": "a"}, {"id": "b", "note": "x"}])
+    assert table == {"columns": ["id", "note"], "rows": [["a", None], ["b", "x"]]}
@@ -0,0 +1,46 @@
+PROJECT = {
+    "id": "p1", "title": "Projekt", "customer": "Kunde", "location": "Berlin", "author": "Autor",
+    "version": "1.0", "date": "2024-01-01T00:00:00+00:00", "status": "active",
+    "updated_at": "2024-01-01T00:00:00+00:00",
+}
+MILESTONE = {
+    "project_id": "p1", "gate": "G1", "status": "planned", "owner": "Autor", "task_ids": [],
+    "updated_at": "2024-01-02T00:00:00+00:00",
+}
+
+
+def test_milestone_with_naive_plan_and_aware_forecast(server, api):
+    api.portal.call(server.db.projects.insert_one, dict(PROJECT))
+    # Written before dates were stored with an offset
+    api.portal.call(server.db.milestones.insert_many, [
+        {**MILESTONE, "id": "m1", "plan": "2024-03-01T00:00:00", "fc": "2024-03-11T00:00:00+00:00", "delta": 10},
+        {**MILESTONE, "id": "m2", "plan": "2024-03-01T00:00:00", "fc": "2024-03-11T00:00:00+00:00", "delta": 3},
+    ])
+
+    response = api.post("/api/consistency/check", params={"incremental": False, "repair": True})
+    assert response.status_code == 200
+    report = response.json()
+    assert report["scanned"]["milestones"] == 2
+    assert report["counts"] == {"drift": 1}
+    assert report["violations"][0]["doc_id"] == "m2"
+
+    repaired = api.portal.call(server.db.milestones.find_one, {"id": "m2"})
+    assert repaired["delta"] == 10
+
+
+def test_unexpected_error_is_reported_as_invalid(server, api, monkeypatch):
+    api.portal.call(server.db.projects.insert_one, dict(PROJECT))
+    api.portal.call(server.db.budget.insert_one, {
+        "id": "b1", "project_id": "p1", "item": "Bau", "plan": 100, "actual": 0, "fc": 120, "delta": 20,
+        "updated_at": "2024-01-02T00:00:00+00:00",
+    })
+
+    def broken(collection, obj):
+        raise TypeError("boom")
+
+    monkeypatch.setattr(server, "expected_derived_fields", broken)
+    response = api.post("/api/consistency/check", params={"incremental": False})
+    assert response.status_code == 200
+    report = response.json()
+    assert report["counts"] == {"invalid": 2}
+    assert {v["doc_id"] for v in report["violations"]} == {"p1", "b1"}
@@ -0,0 +1,36 @@
+from datetime import datetime, timedelta, timezone
+
+PROJECT = {"title": "Alt", "customer": "Kunde", "location": "Berlin", "author": "Autor"}
+
+
+def test_report_of_project_written_before_history(server, api):
+    # Written directly, as data from before the history existed
+    api.portal.call(server.db.projects.insert_one, {
+        "id": "legacy", **PROJECT, "version": "1.0", "date": "2024-01-01T00:00:00+00:00",
+        "status": "active", "updated_at": "2024-01-01T00:00:00+00:00",
+    })
+
+    # The first recorded write is a child create, the project itself is untouched
+    response = api.post("/api/budget", json={"project_id": "legacy", "item": "Bau", "plan": 100, "fc": 120})
+    assert response.status_code == 200
+    response = api.put("/api/projects/legacy", json={**PROJECT, "title": "Neu"})
+    assert response.status_code == 200
+
+    report = api.get("/api/projects/legacy/report", params={"as_of": "2100-01-01T00:00:00Z"})
+    assert report.status_code == 200
+    assert report.json()["project"]["title"] == "Neu"
+    assert report.json()["project"]["customer"] == "Kunde"
+    assert [b["item"] for b in report.json()["budget"]] == ["Bau"]
+
+
+
+def test_history_since_in_another_offset(server, api):
+    project = api.post("/api/projects", json=PROJECT).json()
+    history = api.get(f"/api/projects/{project['id']}/history").json()
+    assert len(history) == 1
+
+    # One hour after the write, written in -05:00
+    written = datetime.fromisoformat(history[0]["ts"].replace("Z", "+00:00"))
+    since = (written + timedelta(hours=1)).astimezone(timezone(timedelta(hours=-5))).isoformat()
+    assert api.get(f"/api/projects/{project['id']}/history", params={"since": since}).json() == []
+    assert api.get(f"/api/projects/{project['id']}/history", params={"limit": 0}).status_code == 422
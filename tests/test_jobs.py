@@ -0,0 +1,63 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+
+def run_for_a_moment(server, job, interval_hours=1):
+    async def run():
+        task = asyncio.ensure_future(server.run_periodically(interval_hours, job))
+        await asyncio.sleep(0.2)
+        task.cancel()
+
+    return run
+
+
+def test_overdue_job_runs_at_startup(server, api):
+    calls = []
+
+    async def nightly():
+        calls.append(server.current_tenant.get())
+
+    long_ago = (datetime.now(timezone.utc) - timedelta(hours=2)).isoformat()
+    api.portal.call(server.db.job_runs.insert_one, {"job": "nightly", "last_run": long_ago})
+    api.portal.call(run_for_a_moment(server, nightly))
+    assert calls == [server.DEFAULT_TENANT]
+
+    run = api.portal.call(server.db.job_runs.find_one, {"job": "nightly"})
+    assert run["last_run"] > long_ago
+
+
+def test_recent_job_is_not_repeated(server, api):
+    calls = []
+
+    async def nightly():
+        calls.append(server.current_tenant.get())
+
+    recent = (datetime.now(timezone.utc) - timedelta(minutes=5)).isoformat()
+    api.portal.call(server.db.job_runs.insert_one, {"job": "nightly", "last_run": recent})
+    api.portal.call(run_for_a_moment(server, nightly))
+    assert calls == []
+
+
+def test_failed_run_is_recorded(server, api):
+    async def nightly():
+        raise RuntimeError("boom")
+
+    api.portal.call(run_for_a_moment(server, nightly))
+    assert api.portal.call(server.db.job_runs.find_one, {"job": "nightly"}) is not None
+
+
+def test_only_one_worker_claims_a_due_run(server, api):
+    calls = []
+
+    async def nightly():
+        calls.append(server.current_tenant.get())
+        await asyncio.sleep(0.05)
+
+    async def two_workers():
+        workers = [asyncio.ensure_future(server.run_periodically(1, nightly)) for _ in range(2)]
+        await asyncio.sleep(0.2)
+        for worker in workers:
+            worker.cancel()
+
+    api.portal.call(two_workers)
+    assert calls == [server.DEFAULT_TENANT]
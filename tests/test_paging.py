@@ -0,0 +1,52 @@
+PROJECT = {"title": "Projekt", "customer": "Kunde", "location": "Berlin", "author": "Autor"}
+
+
+def post_risk(api, project_id, title, p=3):
+    response = api.post("/api/risks", json={
+        "project_id": project_id, "title": title, "cea": "Ursache", "p": p, "a": 2,
+        "trigger": "Verzug", "resp": "Puffer", "owner": "Autor",
+    })
+    assert response.status_code == 200, response.text
+
+
+def titles(response):
+    return [r["title"] for r in response.json()]
+
+
+def test_sorted_pages_with_total(server, api):
+    project = api.post("/api/projects", json=PROJECT).json()["id"]
+    for title, p in [("C", 1), ("A", 5), ("E", 2), ("B", 5), ("D", 4)]:
+        post_risk(api, project, title, p)
+
+    response = api.get("/api/risks", params={"sort": "title", "limit": 2, "with_total": True})
+    assert titles(response) == ["A", "B"]
+    assert response.headers["x-total-count"] == "5"
+    response = api.get("/api/risks", params={"sort": "title", "skip": 4, "limit": 2})
+    assert titles(response) == ["E"]
+    assert "x-total-count" not in response.headers
+
+    # Equal values keep the id order, descending sorts are still stable
+    by_p = titles(api.get("/api/risks", params={"sort": "-p"}))
+    assert by_p[2:] == ["D", "E", "C"]
+    assert sorted(by_p[:2]) == ["A", "B"]
+
+    assert api.get("/api/risks", params={"sort": "nope"}).status_code == 400
+    assert api.get("/api/risks", params={"limit": 1001}).status_code == 422
+
+
+def test_pages_continue_into_the_archive(server, api):
+    closed = api.post("/api/projects", json={**PROJECT, "status": "completed"}).json()["id"]
+    live = api.post("/api/projects", json=PROJECT).json()["id"]
+    for title in ["X", "Y"]:
+        post_risk(api, closed, title)
+    for title in ["A", "B", "C"]:
+        post_risk(api, live, title)
+    assert api.post("/api/archive/run").json()["project_ids"] == [closed]
+
+    params = {"sort": "title", "limit": 2, "include_archived": True, "with_total": True}
+    pages = [api.get("/api/risks", params={**params, "skip": skip}) for skip in [0, 2, 4]]
+    assert [titles(page) for page in pages] == [["A", "B"], ["C", "X"], ["Y"]]
+    assert {page.headers["x-total-count"] for page in pages} == {"5"}
+
+    # Without the archive the same pages end after the live documents
+    assert titles(api.get("/api/risks", params={"sort": "title", "skip": 2})) == ["C"]
@@ -0,0 +1,75 @@
+PROJECT = {
+    "id": "p1", "title": "Projekt", "customer": "Kunde", "location": "Berlin", "author": "Autor",
+    "version": "1.0", "date": "2024-01-01T00:00:00+00:00", "status": "active",
+    "updated_at": "2024-01-01T00:00:00+00:00",
+}
+
+
+def post_task(api, owner, due, prog=0):
+    response = api.post("/api/tasks", json={
+        "project_id": "p1", "pos": 1, "index": "1", "task": "Aufgabe", "owner": owner,
+        "date": "2026-01-01T00:00:00Z", "due": due, "prog": prog,
+    })
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def owner_key(server, api, task):
+    return api.portal.call(server.db.tasks.find_one, {"id": task["id"]})["owner_key"]
+
+
+def test_alias_merges_an_automatically_registered_person(server, api):
+    api.portal.call(server.db.projects.insert_one, dict(PROJECT))
+    first = post_task(api, "Mari", "2026-02-03T00:00:00Z")
+    assert owner_key(server, api, first) == "mari"
+
+    response = api.post("/api/people", json={"name": "Maria  Muster", "aliases": ["Mari"], "capacity_per_week": 2})
+    assert response.status_code == 200
+    assert [p["key"] for p in api.get("/api/people").json()] == ["maria muster"]
+    assert owner_key(server, api, first) == "maria muster"
+
+    second = post_task(api, "mari", "2026-02-04T00:00:00Z")
+    assert owner_key(server, api, second) == "maria muster"
+
+
+def test_workload_buckets_weeks_and_flags_overload(server, api):
+    api.portal.call(server.db.projects.insert_one, dict(PROJECT))
+    api.post("/api/people", json={"name": "Maria Muster", "aliases": ["Mari"], "capacity_per_week": 2})
+    post_task(api, "Mari", "2026-02-02T00:00:00")  # Monday of the first week, naive
+    post_task(api, "Maria Muster", "2026-02-08T23:00:00-02:00")  # Already the second week in UTC
+    post_task(api, "Maria Muster", "2026-02-10T00:00:00Z", prog=100)  # Done
+    post_task(api, "Maria Muster", "2026-02-16T00:00:00")  # After the window
+    post_task(api, "Ben", "2026-02-05T00:00:00Z")
+    api.post("/api/risks", json={
+        "project_id": "p1", "title": "Lieferverzug", "cea": "-", "p": 2, "a": 3, "trigger": "-", "resp": "-",
+        "owner": "Mari",
+    })
+
+    response = api.get("/api/workload", params={"start": "2026-02-04T12:00:00Z", "weeks": 2})
+    assert response.status_code == 200
+    workload = {w["person_key"]: w for w in response.json()}
+    assert set(workload) == {"maria muster", "ben"}
+
+    maria = workload["maria muster"]
+    assert maria["capacity_per_week"] == 2
+    assert [w["week_start"][:10] for w in maria["weeks"]] == ["2026-02-02", "2026-02-09"]
+    assert [(w["tasks"], w["risks"]) for w in maria["weeks"]] == [(1, 1), (1, 0)]
+    assert [w["load"] for w in maria["weeks"]] == [1.5, 1.0]
+    assert not maria["overloaded"]
+    assert workload["ben"]["weeks"][0]["tasks"] == 1
+
+    # The owner filter resolves aliases through the registry
+    response = api.get("/api/workload", params={"start": "2026-02-04T12:00:00Z", "weeks": 2, "owner": "mari"})
+    assert [w["person_key"] for w in response.json()] == ["maria muster"]
+
+
+def test_workload_over_capacity(server, api):
+    api.portal.call(server.db.projects.insert_one, dict(PROJECT))
+    api.post("/api/people", json={"name": "Ben", "capacity_per_week": 1})
+    post_task(api, "Ben", "2026-02-03T00:00:00Z")
+    post_task(api, "Ben", "2026-02-04T00:00:00Z")
+
+    response = api.get("/api/workload", params={"start": "2026-02-02T00:00:00Z", "weeks": 1})
+    ben = response.json()[0]
+    assert ben["weeks"][0]["load"] == 2
+    assert ben["weeks"][0]["overloaded"] and ben["overloaded"]
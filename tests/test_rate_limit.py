@@ -0,0 +1,32 @@
+import ipaddress
+
+from starlette.requests import Request
+
+
+def request(peer, forwarded=None):
+    headers = [(b"x-forwarded-for", forwarded.encode())] if forwarded else []
+    return Request({"type": "http", "headers": headers, "client": (peer, 12345)})
+
+
+def test_forwarded_for_is_ignored_without_trusted_proxies(server):
+    assert server.client_key(request("203.0.113.7", "198.51.100.1")) == "203.0.113.7"
+
+
+def test_forwarded_for_behind_trusted_proxy(server, monkeypatch):
+    monkeypatch.setattr(server, "TRUSTED_PROXIES", [ipaddress.ip_network("10.0.0.0/8")])
+    # Direct requests from elsewhere cannot pick their key
+    assert server.client_key(request("203.0.113.7", "198.51.100.1")) == "203.0.113.7"
+    # The proxy appended the real peer, the spoofed entry left of it is not used
+    assert server.client_key(request("10.0.0.2", "1.2.3.4, 198.51.100.1")) == "198.51.100.1"
+    assert server.client_key(request("10.0.0.2", "198.51.100.1, 10.0.0.3")) == "198.51.100.1"
+
+
+def test_buckets_are_bounded(server):
+    limiter = server.TokenBucketLimiter(60, 2, max_buckets=3)
+    for client in ["a", "b", "c"]:
+        assert limiter.take(client) == 0
+    assert limiter.take("a") == 0
+    assert limiter.take("a") > 0
+    limiter.take("d")
+    # "b" was used least recently
+    assert list(limiter.buckets) == ["c", "a", "d"]
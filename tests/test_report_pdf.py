@@ -0,0 +1,83 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+pytest.importorskip("reportlab")
+
+PROJECT = {"title": "Projekt", "customer": "Kunde", "location": "Berlin", "author": "Autor"}
+
+
+@pytest.fixture
+def reports(server, monkeypatch):
+    # Threads instead of spawned processes, rendering is the same
+    pool = ThreadPoolExecutor(1)
+    monkeypatch.setattr(server, "get_report_pool", lambda: pool)
+    monkeypatch.setattr(server, "REPORT_RENDER_DELAY", 0)
+    yield server
+    pool.shutdown()
+
+
+def wait_for(api, condition):
+    for _ in range(100):
+        if condition():
+            return True
+        api.portal.call(asyncio.sleep, 0.05)
+    return False
+
+
+def test_pdf_is_cached_until_the_data_changes(reports, api):
+    project = api.post("/api/projects", json=PROJECT).json()
+    url = f"/api/projects/{project['id']}/report.pdf"
+
+    response = api.get(url)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/pdf"
+    assert response.content.startswith(b"%PDF")
+    etag = response.headers["etag"]
+    assert api.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    # The write renders the report again in the background, the old one goes
+    api.post("/api/budget", json={"project_id": project["id"], "item": "Bau", "plan": 100})
+    cache = reports.report_dir(project["id"])
+    new_etag = None
+
+    def refreshed():
+        nonlocal new_etag
+        files = [p.stem for p in cache.glob("*.pdf")]
+        if len(files) == 1 and f'"{files[0]}"' != etag:
+            new_etag = f'"{files[0]}"'
+            return True
+        return False
+
+    assert wait_for(api, refreshed)
+    response = api.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] == new_etag
+
+
+def test_missing_cache_file_is_rendered_again(reports, api):
+    project = api.post("/api/projects", json=PROJECT).json()
+    url = f"/api/projects/{project['id']}/report.pdf"
+    assert api.get(url).status_code == 200
+    for path in reports.report_dir(project["id"]).glob("*.pdf"):
+        path.unlink()
+    response = api.get(url)
+    assert response.status_code == 200
+    assert response.content.startswith(b"%PDF")
+
+
+def test_unknown_project(reports, api):
+    assert api.get("/api/projects/missing/report.pdf").status_code == 404
+
+
+def test_project_ids_stay_inside_the_cache(reports, api, tmp_path):
+    victim = tmp_path / "victim"
+    victim.mkdir()
+    for project_id in [str(victim), "../..", "../../victim"]:
+        assert reports.report_dir(project_id).parent == reports.REPORT_CACHE_DIR / reports.DEFAULT_TENANT
+        response = api.post("/api/budget", json={"project_id": project_id, "item": "Bau", "plan": 100})
+        assert response.status_code == 200
+    api.portal.call(asyncio.sleep, 0.2)
+    assert victim.is_dir()
+    assert not reports.pending_report_refreshes
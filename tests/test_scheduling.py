@@ -0,0 +1,169 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from scheduling import CycleError, ScheduleGraph
+
+DAY0 = datetime(2024, 3, 4, tzinfo=timezone.utc)
+
+
+def task(task_id, start, days, *predecessors):
+    date = DAY0 + timedelta(days=start)
+    return {"id": task_id, "date": date, "due": date + timedelta(days=days), "predecessors": list(predecessors)}
+
+
+def chain():
+    # a -> b -> d and a -> c -> d, c is the long branch
+    return [task("a", 0, 2), task("b", 0, 1, "a"), task("c", 0, 5, "a"), task("d", 0, 1, "b", "c")]
+
+
+def forecasts(graph):
+    return {task_id: (graph.es[task_id], graph.ef[task_id]) for task_id in graph.order()}
+
+
+def test_order_puts_predecessors_first():
+    order = ScheduleGraph(chain()).order()
+    assert order.index("a") < order.index("b") < order.index("d")
+    assert order.index("c") < order.index("d")
+
+
+def test_cycle_is_rejected():
+    graph = ScheduleGraph(chain())
+    graph.add(task("a", 0, 2, "d"))
+    with pytest.raises(CycleError, match="a, b, c, d"):
+        graph.order()
+
+
+def test_unknown_predecessors_are_ignored():
+    graph = ScheduleGraph([task("a", 0, 2, "missing")])
+    graph.forward()
+    assert graph.es["a"] == DAY0
+
+
+def test_forward_pass():
+    graph = ScheduleGraph(chain())
+    graph.forward()
+    assert graph.ef["a"] == DAY0 + timedelta(days=2)
+    assert graph.es["d"] == DAY0 + timedelta(days=7)
+    assert graph.ef["d"] == DAY0 + timedelta(days=8)
+
+
+def test_incremental_forward_matches_full_pass():
+    graph = ScheduleGraph(chain())
+    graph.forward()
+    graph.add(task("b", 0, 9, "a"))
+    moved = graph.forward(["b"])
+    assert moved == {"b", "d"}
+
+    full = ScheduleGraph(chain()[:1] + [task("b", 0, 9, "a")] + chain()[2:])
+    full.forward()
+    assert forecasts(graph) == forecasts(full)
+
+
+def test_added_tasks_keep_the_cached_order():
+    graph = ScheduleGraph(chain())
+    order = graph.order()
+    graph.add(task("e", 0, 1, "d"))
+    graph.add(task("b", 3, 1, "a"))
+    assert graph.order() is order
+    assert order[-1] == "e"
+
+    # An edge against the order sorts again
+    graph.add(task("c", 0, 5, "a", "e"))
+    with pytest.raises(CycleError):
+        graph.order()
+
+
+def test_task_waited_for_before_it_exists():
+    graph = ScheduleGraph([task("b", 0, 1, "a")])
+    graph.order()
+    graph.add(task("a", 0, 2))
+    assert graph.order() == ["a", "b"]
+
+
+def test_backward_pass_slack():
+    graph = ScheduleGraph(chain())
+    graph.forward()
+    ls, lf, slack = graph.backward()
+    assert lf["d"] == DAY0 + timedelta(days=8)
+    assert slack["b"] == timedelta(days=4)
+    assert {task_id for task_id, s in slack.items() if s == timedelta(0)} == {"a", "c", "d"}
+
+
+PROJECT = {
+    "id": "p1", "title": "Projekt", "customer": "Kunde", "location": "Berlin", "author": "Autor",
+    "version": "1.0", "date": "2024-01-01T00:00:00+00:00", "status": "active",
+    "updated_at": "2024-01-01T00:00:00+00:00",
+}
+
+
+def post_task(api, index, date, due, *predecessors):
+    response = api.post("/api/tasks", json={
+        "project_id": "p1", "pos": 1, "index": index, "task": index, "owner": "Autor",
+        "date": date, "due": due, "predecessors": list(predecessors),
+    })
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_task_writes_reuse_the_cached_graph(server, api):
+    api.portal.call(server.db.projects.insert_one, dict(PROJECT))
+    a = post_task(api, "A", "2024-03-04T00:00:00Z", "2024-03-06T00:00:00Z")
+    graph = server.schedule_graphs.get((server.DEFAULT_TENANT, "p1"))[1]
+
+    b = post_task(api, "B", "2024-03-04T00:00:00Z", "2024-03-05T00:00:00Z", a["id"])
+    assert b["fc_start"].startswith("2024-03-06")
+    assert server.schedule_graphs.get((server.DEFAULT_TENANT, "p1"))[1] is graph
+
+    # A rejected write does not leave its task behind
+    response = api.put(f"/api/tasks/{a['id']}", json={
+        "project_id": "p1", "pos": 1, "index": "A", "task": "A", "owner": "Autor",
+        "date": "2024-03-04T00:00:00Z", "due": "2024-03-06T00:00:00Z", "predecessors": [b["id"]],
+    })
+    assert response.status_code == 400
+    schedule = api.get("/api/projects/p1/schedule").json()
+    assert schedule["critical_path"] == [a["id"], b["id"]]
+
+
+def test_foreign_write_invalidates_the_cached_graph(server, api):
+    api.portal.call(server.db.projects.insert_one, dict(PROJECT))
+    a = post_task(api, "A", "2024-03-04T00:00:00Z", "2024-03-06T00:00:00Z")
+    b = post_task(api, "B", "2024-03-04T00:00:00Z", "2024-03-05T00:00:00Z", a["id"])
+
+    # Another worker moves A, only the history seq tells
+    before = api.portal.call(server.db.tasks.find_one, {"id": a["id"]}, {"_id": 0})
+    after = {**before, "due": "2024-03-08T00:00:00+00:00"}
+    api.portal.call(server.db.tasks.replace_one, {"id": a["id"]}, after)
+    api.portal.call(server.record_history, "p1", "tasks", a["id"], before, after)
+
+    response = api.post("/api/projects/p1/schedule/recalculate")
+    assert response.status_code == 200
+    fc = {t["task_id"]: t["es"] for t in response.json()["tasks"]}
+    assert fc[b["id"]].startswith("2024-03-08")
+
+
+def test_forecasts_are_part_of_the_history(server, api):
+    api.portal.call(server.db.projects.insert_one, dict(PROJECT))
+    a = post_task(api, "A", "2026-01-05T00:00:00Z", "2026-01-10T00:00:00Z")
+    b = post_task(api, "B", "2026-01-05T00:00:00Z", "2026-01-09T00:00:00Z", a["id"])
+
+    live = {t["id"]: t["fc_due"] for t in api.get("/api/projects/p1/report").json()["tasks"]}
+    past = api.get("/api/projects/p1/report", params={"as_of": "2100-01-01T00:00:00Z"}).json()
+    assert {t["id"]: t["fc_due"] for t in past["tasks"]} == live
+    assert live[b["id"]].startswith("2026-01-14")
+
+    # The cached graph stays in use, the forecast entries are its own writes
+    assert server.schedule_graphs.get((server.DEFAULT_TENANT, "p1")) is not None
+
+
+def test_milestone_tasks_must_belong_to_its_project(server, api):
+    api.portal.call(server.db.projects.insert_one, dict(PROJECT))
+    api.portal.call(server.db.projects.insert_one, {**PROJECT, "id": "p2"})
+    a = post_task(api, "A", "2026-01-05T00:00:00Z", "2026-01-10T00:00:00Z")
+    milestone = {"gate": "G1", "plan": "2026-01-12T00:00:00Z", "owner": "Autor", "task_ids": [a["id"]]}
+
+    response = api.post("/api/milestones", json={**milestone, "project_id": "p2"})
+    assert response.status_code == 400
+    response = api.post("/api/milestones", json={**milestone, "project_id": "p1"})
+    assert response.status_code == 200
+    assert response.json()["delta"] == -2
@@ -0,0 +1,39 @@
+PROJECT = {"title": "Projekt", "customer": "Kunde", "location": "Berlin", "author": "Autor"}
+
+
+def sync_all(api, **params):
+    pages = []
+    while True:
+        page = api.get("/api/sync", params=params).json()
+        pages.append(page)
+        if not page["has_more"]:
+            return pages
+        params = {"cursor": page["cursor"], "limit": params["limit"]}
+
+
+def test_sync_pages_through_all_collections(server, api):
+    projects = [api.post("/api/projects", json=PROJECT).json() for _ in range(3)]
+    for project in projects:
+        for item in ["Bau", "Planung"]:
+            api.post("/api/budget", json={"project_id": project["id"], "item": item, "plan": 100})
+
+    pages = sync_all(api, limit=2)
+    assert [len(p["projects"]) + len(p["budget"]) for p in pages] == [2, 2, 2, 2, 1]
+    assert pages[0]["full"] and not any(p["full"] for p in pages[1:])
+    assert {p["watermark"] for p in pages} == {pages[0]["watermark"]}
+    assert sorted(p["id"] for page in pages for p in page["projects"]) == sorted(p["id"] for p in projects)
+    assert sum(len(page["budget"]) for page in pages) == 6
+
+
+def test_delta_sync_sends_deletes_with_the_last_page(server, api):
+    projects = [api.post("/api/projects", json=PROJECT).json() for _ in range(3)]
+    watermark = api.get("/api/sync").json()["watermark"]
+    api.delete(f"/api/projects/{projects[0]['id']}")
+
+    pages = sync_all(api, updated_since=watermark, limit=1)
+    assert all(not p["deleted"] for p in pages[:-1])
+    assert pages[-1]["deleted"] == {"projects": [projects[0]["id"]]}
+
+
+def test_invalid_cursor(server, api):
+    assert api.get("/api/sync", params={"cursor": "kaputt"}).status_code == 400
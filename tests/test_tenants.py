@@ -0,0 +1,57 @@
+def test_unknown_tenant_is_rejected(server, api):
+    response = api.get("/api/projects", headers={"X-Tenant-ID": "someone"})
+    assert response.status_code == 403
+    assert "someone" not in server.ready_tenants
+    assert "someone" not in server.tenant_gate.metrics
+
+
+def test_registered_tenant_is_accepted(server, api, monkeypatch):
+    monkeypatch.setattr(server, "TENANT_ADMIN_TOKEN", "secret")
+    response = api.post("/api/tenants", json={"id": "Werk-Nord"}, headers={"X-Admin-Token": "wrong"})
+    assert response.status_code == 403
+
+    response = api.post("/api/tenants", json={"id": "Werk-Nord"}, headers={"X-Admin-Token": "secret"})
+    assert response.status_code == 200
+    assert response.json() == {"id": "werk-nord"}
+    response = api.get("/api/projects", headers={"X-Tenant-ID": "werk-nord"})
+    assert response.status_code == 200
+
+
+def test_registration_is_disabled_without_token(server, api):
+    response = api.post("/api/tenants", json={"id": "werk-sued"}, headers={"X-Admin-Token": ""})
+    assert response.status_code == 403
+
+
+def test_slot_is_held_while_the_body_streams(server, api):
+    in_flight = []
+
+    async def streaming_app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        for _ in range(3):
+            await send({"type": "http.response.body", "body": b"{}\n", "more_body": True})
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+    async def send(message):
+        in_flight.append(server.tenant_gate.stats(server.DEFAULT_TENANT)["in_flight"])
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    scope = {"type": "http", "method": "GET", "path": "/api/export", "headers": [], "query_string": b""}
+    api.portal.call(server.IsolateTenant(streaming_app), scope, receive, send)
+    assert in_flight == [1] * 5
+    assert server.tenant_gate.stats(server.DEFAULT_TENANT)["in_flight"] == 0
+
+
+def test_metrics_of_other_tenants_need_the_admin_token(server, api, monkeypatch):
+    monkeypatch.setattr(server, "TENANT_ADMIN_TOKEN", "secret")
+    api.post("/api/tenants", json={"id": "werk-nord"}, headers={"X-Admin-Token": "secret"})
+    api.get("/api/projects", headers={"X-Tenant-ID": "werk-nord"})
+
+    own = api.get("/api/tenants/metrics").json()
+    assert [m["tenant"] for m in own] == ["default"]
+    own = api.get("/api/tenants/metrics", headers={"X-Tenant-ID": "werk-nord"}).json()
+    assert [m["tenant"] for m in own] == ["werk-nord"]
+
+    everyone = api.get("/api/tenants/metrics", headers={"X-Admin-Token": "secret"}).json()
+    assert {"default", "werk-nord"} <= {m["tenant"] for m in everyone}